@@ -0,0 +1,277 @@
+"""
+Benchmarks für die Hot Paths (Schwellwert, Histogramm, lokales Otsu, Dice, Laden).
+
+Aufruf:
+    python benchmark.py                       # Standardgrößen 256², 1024²
+    python benchmark.py --sizes 256 1024 4096 8192 --dtypes uint8 uint16
+    python benchmark.py --save-baseline       # Ergebnis als Referenz ablegen
+    python benchmark.py --compare             # gegen Referenz prüfen (Exit-Code 1 bei Regression)
+
+Gemessen werden Median-Laufzeit (mehrere Wiederholungen) und Spitzenspeicher
+(tracemalloc, separater Lauf). Fälle mit gleicher Gruppe, aber Implementierung
+"custom" bzw. "skimage" werden zusätzlich gegenübergestellt.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import tifffile
+
+from src.gray_hist import compute_gray_histogram, image_histogram, sparse_histogram
+from src.otsu_global import otsu_threshold, otsu_threshold_sparse, apply_global_otsu
+from src.otsu_local import local_otsu, tiled_otsu
+from src.dice_score import dice_score
+from src.packed_mask import PackedMask
+from src.load_image_pair import load_image_and_gt
+from process_image import apply_skimage_global, apply_skimage_local
+
+BASELINE_PATH = os.path.join("results", "benchmark_baseline.json")
+
+# lokales Otsu wächst mit H·W·256 → nur bis zu dieser Kantenlänge messen
+MAX_LOCAL_SIZE = 1024
+
+
+def synthetic_pair(size: int, dtype: str, seed: int = 0):
+    """
+    Reproduzierbares Testbild (helle Kreisscheiben auf verrauschtem Hintergrund)
+    mit zugehöriger GT-Maske.
+    """
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[:size, :size]
+    gt = np.zeros((size, size), dtype=bool)
+    for _ in range(max(4, size // 32)):
+        cy, cx = rng.integers(0, size, 2)
+        r = rng.integers(size // 64 + 2, size // 16 + 4)
+        win = (slice(max(0, cy - r), cy + r), slice(max(0, cx - r), cx + r))
+        gt[win] |= (yy[win] - cy) ** 2 + (xx[win] - cx) ** 2 <= r * r
+    image = 0.2 + 0.5 * gt + rng.normal(0, 0.08, gt.shape)
+    image = np.clip(image, 0, 1)
+
+    if dtype == "uint8":
+        image = (image * 255).astype(np.uint8)
+    elif dtype == "uint16":
+        image = (image * 4095).astype(np.uint16)  # 12-Bit-Daten im 16-Bit-Container
+    return image, gt
+
+
+def measure(func, min_time: float = 0.2, max_repeat: int = 20) -> dict:
+    """
+    Median-Laufzeit über mehrere Wiederholungen und Spitzenspeicher eines Aufrufs.
+
+    Wiederholt bis min_time erreicht ist (höchstens max_repeat-mal); schnelle
+    Fälle mindestens dreimal, sehr langsame (> 2 s gesamt) nur einmal.
+    """
+    times = []
+    start = time.perf_counter()
+    while not times or (
+        len(times) < max_repeat
+        and (time.perf_counter() - start < min_time or (len(times) < 3 and time.perf_counter() - start < 2.0))
+    ):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "time_s": statistics.median(times),
+        "min_s": min(times),
+        "repeat": len(times),
+        "peak_mb": peak / 1024**2,
+    }
+
+
+def benchmark_cases(sizes, dtypes, radii, tmp_dir):
+    """
+    Liefert (Name, Gruppe, Implementierung, Aufruf) für alle Fälle.
+
+    Fälle derselben Gruppe messen dieselbe Aufgabe mit unterschiedlicher
+    Implementierung (custom / skimage).
+    """
+    hist256 = np.bincount(np.random.default_rng(0).integers(0, 256, 10_000), minlength=256)
+    p256 = hist256 / hist256.sum()
+    yield "otsu_threshold/256", "otsu_threshold/256", "custom", lambda: otsu_threshold(p256)
+
+    hist16 = np.zeros(65536, dtype=np.int64)
+    hist16[np.random.default_rng(0).integers(0, 4096, 10_000)] += 1
+    yield ("otsu_threshold_sparse/65536", "otsu_threshold/65536", "custom",
+           lambda: otsu_threshold_sparse(*sparse_histogram(hist16)))
+    yield "otsu_threshold/65536", "otsu_threshold/65536", "dense", lambda: otsu_threshold(hist16 / hist16.sum())
+
+    for size in sizes:
+        for dtype in dtypes:
+            image, gt = synthetic_pair(size, dtype)
+            key = f"{size}/{dtype}"
+
+            if dtype == "uint8":
+                yield (f"compute_gray_histogram/{key}", f"histogram/{key}", "custom",
+                       lambda image=image: compute_gray_histogram(image))
+            yield f"image_histogram/{key}", f"histogram/{key}", "native", lambda image=image: image_histogram(image)
+
+            yield f"global_otsu/{key}", f"global/{key}", "custom", lambda image=image: apply_global_otsu(image)
+            yield f"skimage_global/{key}", f"global/{key}", "skimage", lambda image=image: apply_skimage_global(image)
+
+            yield f"tiled_otsu/{key}", f"local/{key}/tiled", "custom", lambda image=image: tiled_otsu(image)
+            if size <= MAX_LOCAL_SIZE:
+                for r in radii:
+                    yield (f"local_otsu/{key}/r{r}", f"local/{key}/r{r}", "custom",
+                           lambda image=image, r=r: local_otsu(image, radius=r))
+                    yield (f"skimage_local/{key}/r{r}", f"local/{key}/r{r}", "skimage",
+                           lambda image=image, r=r: apply_skimage_local(image, block_size=2 * r + 1))
+
+        # Dice: dtype-unabhängig
+        image, gt = synthetic_pair(size, "uint8")
+        pred = apply_global_otsu(image)
+        pred_bool, pred_packed, gt_packed = pred.astype(bool), PackedMask.from_array(pred), PackedMask.from_array(gt)
+        yield f"dice_score/{size}/bool", f"dice/{size}", "custom", lambda a=pred_bool, b=gt: dice_score(a, b)
+        yield f"dice_score/{size}/packed", f"dice/{size}", "packed", lambda a=pred_packed, b=gt_packed: dice_score(a, b)
+
+        # Laden: unkomprimiertes TIFF, dekodiert vs. speicherabgebildet
+        image, gt = synthetic_pair(size, "uint16")
+        img_path = os.path.join(tmp_dir, f"img_{size}.tif")
+        gt_path = os.path.join(tmp_dir, f"gt_{size}.tif")
+        tifffile.imwrite(img_path, image)
+        tifffile.imwrite(gt_path, gt.astype(np.uint8))
+        yield (f"load_image_and_gt/{size}", f"load/{size}", "imread",
+               lambda a=img_path, b=gt_path: load_image_and_gt(a, b))
+        yield (f"load_image_and_gt/{size}/mmap", f"load/{size}", "mmap",
+               lambda a=img_path, b=gt_path: load_image_and_gt(a, b, mmap=True))
+
+
+def end_to_end_case(tmp_dir, n_images: int = 4, size: int = 256):
+    """
+    run_batch_evaluation auf einem synthetischen Datensatz (Einzelbilder t01.tif … /
+    man_seg01.tif wie bei der Cell Tracking Challenge), alle registrierten Methoden.
+    """
+    from run_batch_evaluation import run_batch_evaluation
+
+    img_dir = os.path.join(tmp_dir, "SYN", "img")
+    gt_dir = os.path.join(tmp_dir, "SYN", "gt")
+    os.makedirs(img_dir, exist_ok=True)
+    os.makedirs(gt_dir, exist_ok=True)
+    for k in range(n_images):
+        image, gt = synthetic_pair(size, "uint16", seed=k)
+        tifffile.imwrite(os.path.join(img_dir, f"t{k:02d}.tif"), image)
+        tifffile.imwrite(os.path.join(gt_dir, f"man_seg{k:02d}.tif"), gt.astype(np.uint8))
+
+    name = f"run_batch_evaluation/{n_images}x{size}"
+    return name, "end_to_end", "custom", lambda: run_batch_evaluation(img_dir, gt_dir, dataset="SYN")
+
+
+def run_benchmarks(sizes, dtypes, radii, pattern=None, end_to_end=True) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Generator: Testbilder einer Größe entstehen erst, wenn sie gebraucht werden
+        cases = benchmark_cases(sizes, dtypes, radii, tmp_dir)
+        if end_to_end:
+            cases = itertools.chain(cases, [end_to_end_case(tmp_dir)])
+
+        for name, group, impl, func in cases:
+            if pattern and pattern not in name:
+                continue
+            result = measure(func)
+            result.update(group=group, impl=impl)
+            results[name] = result
+            print(f"{name:45s} {result['time_s'] * 1e3:10.2f} ms {result['peak_mb']:9.1f} MB", flush=True)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare_implementations(results: dict) -> None:
+    """
+    Gibt je Gruppe die Laufzeit der Implementierungen relativ zur schnellsten aus.
+    """
+    groups = {}
+    for name, r in results.items():
+        groups.setdefault(r["group"], []).append((r["time_s"], r["impl"], name))
+
+    print("\n⚖️  Vergleich der Implementierungen (Faktor zur schnellsten)")
+    for group, entries in sorted(groups.items()):
+        if len(entries) < 2:
+            continue
+        fastest = min(t for t, _, _ in entries)
+        line = ", ".join(f"{impl} {t / fastest:.2f}×" for t, impl, _ in sorted(entries))
+        print(f"   {group:30s} {line}")
+
+
+def check_regressions(results: dict, baseline: dict, tolerance: float = 1.25) -> list:
+    """
+    Fälle, deren Laufzeit oder Spitzenspeicher um mehr als `tolerance` über der
+    Referenz liegt. Sehr kurze Fälle (< 1 ms) werden nur beim Speicher geprüft.
+    """
+    regressions = []
+    for name, r in results.items():
+        ref = baseline.get("results", {}).get(name)
+        if ref is None:
+            continue
+        if r["time_s"] >= 1e-3 and r["time_s"] > tolerance * ref["time_s"]:
+            regressions.append(f"{name}: Zeit {ref['time_s'] * 1e3:.2f} → {r['time_s'] * 1e3:.2f} ms")
+        if r["peak_mb"] > 1.0 and r["peak_mb"] > tolerance * ref["peak_mb"]:
+            regressions.append(f"{name}: Speicher {ref['peak_mb']:.1f} → {r['peak_mb']:.1f} MB")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks der Otsu-Pipeline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 1024])
+    parser.add_argument("--dtypes", nargs="+", default=["uint8", "uint16", "float64"])
+    parser.add_argument("--radii", type=int, nargs="+", default=[3, 7])
+    parser.add_argument("-k", "--filter", default=None, help="nur Fälle, deren Name dies enthält")
+    parser.add_argument("--no-end-to-end", action="store_true")
+    parser.add_argument("--output", default=os.path.join("results", "benchmark.json"))
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.dtypes, args.radii, args.filter, not args.no_end_to_end)
+    compare_implementations(report["results"])
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Ergebnisse gespeichert: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Referenz gespeichert: {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"⚠️ Keine Referenz unter {args.baseline}")
+            return 1
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = check_regressions(report["results"], baseline, args.tolerance)
+        for line in regressions:
+            print(f"❌ Regression: {line}")
+        if not regressions:
+            print("✅ Keine Regression gegenüber der Referenz")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,70 @@
-import pandas as pd
-from src.dice_score import dice_score
-from typing import Dict
+from src.dice_score import dice_scores, prepare_gt_instances, instance_dice_prepared
+from src.packed_mask import PackedMask
+from typing import TYPE_CHECKING, Dict, List, Optional
 import numpy as np
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+def score_segmentations(
+    gt_mask: np.ndarray,
+    predictions: Dict[str, np.ndarray],
+    gt_labels: Optional[np.ndarray] = None
+) -> List[dict]:
+    """
+    Berechnet die Dice Scores aller Segmentierungsmethoden ohne pandas.
+
+    Alle Masken werden zu einem Stapel (M, H, W) zusammengefasst und in einem
+    Durchlauf gegen die einmal aufbereitete GT bewertet.
+
+    Args:
+        gt_mask: Ground Truth Maske (bool)
+        predictions: Dict {Methodenname: Binärmaske (0/1, bool oder PackedMask)}
+        gt_labels: optionales Instanz-Labelbild der GT; dann wird zusätzlich
+                   der Instanz-Dice je Methode berechnet
+
+    Returns:
+        Liste von Records {"Methode", "Dice Score"[, "Instanz Dice Score"]},
+        absteigend nach Dice Score
+    """
+    names = list(predictions)
+    if not names:
+        return []
+
+    masks = [predictions[name] for name in names]
+    if all(isinstance(mask, PackedMask) for mask in masks):
+        dice = dice_scores(masks, gt_mask)
+    else:
+        dice = dice_scores(np.stack([np.asarray(mask) for mask in masks]), gt_mask)
+
+    # GT-Instanzen einmal labeln und zählen, nicht pro Methode
+    gt_instances = prepare_gt_instances(gt_labels) if gt_labels is not None else None
+
+    results = []
+    for name, score in zip(names, dice):
+        record = {"Methode": name, "Dice Score": float(score)}
+        if gt_instances is not None:
+            record["Instanz Dice Score"] = instance_dice_prepared(predictions[name], *gt_instances)
+        results.append(record)
+
+    results.sort(key=lambda r: r["Dice Score"], reverse=True)
+    return results
+
 def evaluate_segmentations(
     gt_mask: np.ndarray,
-    predictions: Dict[str, np.ndarray]
-) -> pd.DataFrame:
+    predictions: Dict[str, np.ndarray],
+    gt_labels: Optional[np.ndarray] = None
+) -> "pd.DataFrame":
     """
     Berechnet die Dice Scores aller Segmentierungsmethoden.
 
     Args:
         gt_mask: Ground Truth Maske (bool)
         predictions: Dict {Methodenname: Binärmaske (0/1 oder bool)}
+        gt_labels: optionales Instanz-Labelbild der GT (für den Instanz-Dice)
 
     Returns:
         DataFrame mit Methode und zugehörigem Dice Score
     """
-    results = []
-
-    for name, pred in predictions.items():
-        dice = dice_score(pred.astype(bool), gt_mask.astype(bool))
-        results.append({"Methode": name, "Dice Score": dice})
-
-    df = pd.DataFrame(results).sort_values("Dice Score", ascending=False)
-    return df
+    import pandas as pd
+    return pd.DataFrame(score_segmentations(gt_mask, predictions, gt_labels))
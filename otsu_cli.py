@@ -0,0 +1,185 @@
+"""
+Gemeinsamer Einstiegspunkt für Segmentierung, Auswertung, Visualisierung und Report.
+
+    python otsu_cli.py segment data/N2DL-HeLa/img/t13.tif --out masks/
+    python otsu_cli.py evaluate --workers 4 --trace
+    python otsu_cli.py visualize --thumbnail 256 --overlay
+    python otsu_cli.py report
+
+Schwere Bibliotheken (pandas, matplotlib, seaborn, skimage.filters) werden erst
+in den Unterbefehlen bzw. Methoden importiert, die sie brauchen.
+"""
+import argparse
+import os
+import re
+import sys
+
+
+def _mask_filename(image_path: str, method: str) -> str:
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    slug = re.sub(r"\W+", "_", method.lower()).strip("_")
+    return f"{stem}_{slug}.png"
+
+
+def cmd_segment(args) -> int:
+    from src.load_image_pair import read_image
+    from process_image import process_all_methods
+
+    image = read_image(args.image, mmap=True)
+    results = process_all_methods(image, methods=args.method, max_cost=args.max_cost,
+                                  workers=args.threads)
+
+    if args.out:
+        from PIL import Image
+        os.makedirs(args.out, exist_ok=True)
+
+    for name, mask in results.items():
+        line = f"{name}: {mask.shape}, Positiv: {int(mask.sum())}"
+        if args.out:
+            path = os.path.join(args.out, _mask_filename(args.image, name))
+            Image.fromarray((mask != 0).astype("uint8") * 255).save(path, compress_level=1)
+            line += f" → {path}"
+        print(line)
+    return 0
+
+
+def cmd_evaluate(args) -> int:
+    from src import tracing
+    from src.dataset_catalog import DatasetCatalog
+    from src.results_writer import ResultsWriter
+    from src.run_manifest import RunManifest
+    from run_batch_evaluation import run_batch_evaluation
+
+    if args.trace:
+        tracing.enable()
+    os.makedirs(args.results, exist_ok=True)
+    if args.visuals:
+        os.makedirs(args.visuals, exist_ok=True)
+
+    csv_path = os.path.join(args.results, "dice_scores.csv")
+    # Fertige Einheiten kommen aus dem Manifest, die CSV wird jedes Mal neu geschrieben
+    writer = ResultsWriter(csv_path, ["Bild", "Methode", "Dice Score", "Datensatz"])
+    manifest = RunManifest(os.path.join(args.results, "manifest.jsonl"))
+
+    catalog = DatasetCatalog(args.data)
+    for dataset in catalog.skipped:
+        print(f"⚠️ Überspringe {dataset}, img/ oder gt/ fehlt.")
+
+    for dataset in catalog.datasets():
+        if args.dataset and dataset not in args.dataset:
+            continue
+        for basename in catalog.missing(dataset):
+            print(f"⚠️  Ground Truth fehlt für {basename}, überspringe.")
+
+        print(f"🧪 Verarbeite Datensatz: {dataset}")
+        try:
+            run_batch_evaluation(*catalog.dirs(dataset), dataset=dataset, visual_dir=args.visuals,
+                                 cache_dir=None if args.no_cache else args.cache, workers=args.workers,
+                                 writer=writer, manifest=manifest, pairs=catalog.pairs(dataset),
+                                 thumbnail=args.thumbnail)
+        except Exception as e:
+            print(f"❌ Fehler bei {dataset}: {e}")
+
+    writer.close()
+    manifest.close()
+    if tracing.enabled():
+        tracing.export(args.results)
+    if not writer.completed():
+        print("⚠️ Keine Ergebnisse vorhanden.")
+        return 1
+
+    print(f"✅ Ergebnisse gespeichert: {csv_path}")
+    if args.report:
+        from report import create_report
+        create_report(csv_path, args.results)
+    return 0
+
+
+def cmd_visualize(args) -> int:
+    from src.dataset_catalog import DatasetCatalog
+    from src.load_image_pair import load_image_and_gt
+    from src.mask_cache import MaskCache
+    from src.render_panels import render_segmentations
+    from process_image import process_all_methods
+
+    cache = None if args.no_cache else MaskCache(args.cache)
+    os.makedirs(args.out, exist_ok=True)
+    catalog = DatasetCatalog(args.data)
+
+    for dataset, img_path, gt_path in catalog:
+        if args.dataset and dataset not in args.dataset:
+            continue
+        basename = os.path.basename(img_path)
+        try:
+            image, gt_mask = load_image_and_gt(img_path, gt_path, mmap=True)
+            predictions = process_all_methods(image, cache=cache, methods=args.method, packed=True)
+            save_path = os.path.join(args.out, f"{dataset}_{basename}.png")
+            render_segmentations(image, gt_mask, predictions, save_path, thumbnail=args.thumbnail,
+                                 mode="overlay" if args.overlay else "panels")
+            print(f"✅ Gespeichert: {save_path}")
+        except Exception as e:
+            print(f"❌ Fehler bei {basename}: {e}")
+    return 0
+
+
+def cmd_report(args) -> int:
+    if not os.path.exists(args.csv):
+        print(f"⚠️ Datei nicht gefunden: {args.csv}")
+        return 1
+    from report import create_report
+    create_report(args.csv, args.out)
+    print("🏁 Report erstellt.")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Otsu-Segmentierung und Auswertung")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("segment", help="ein Bild mit allen (oder ausgewählten) Methoden segmentieren")
+    p.add_argument("image")
+    p.add_argument("--method", action="append", help="Methodenname (mehrfach möglich)")
+    p.add_argument("--max-cost", type=float, default=None, help="teurere Methoden überspringen")
+    p.add_argument("--threads", type=int, default=1)
+    p.add_argument("--out", default=None, help="Verzeichnis für die Masken (PNG)")
+    p.set_defaults(func=cmd_segment)
+
+    p = sub.add_parser("evaluate", help="Dice Scores für alle Datensätze berechnen")
+    p.add_argument("--data", default="data")
+    p.add_argument("--dataset", action="append", help="nur diese(n) Datensatz/Datensätze")
+    p.add_argument("--results", default="results")
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--cache", default=".mask_cache")
+    p.add_argument("--no-cache", action="store_true")
+    p.add_argument("--trace", action="store_true", help="Laufzeiten je Stufe aufzeichnen")
+    p.add_argument("--visuals", default=None, help="zusätzlich Visualisierungen hierhin schreiben")
+    p.add_argument("--thumbnail", type=int, default=None)
+    p.add_argument("--report", action="store_true", help="danach die Vergleichsplots erstellen")
+    p.set_defaults(func=cmd_evaluate)
+
+    p = sub.add_parser("visualize", help="Original, GT und Masken als PNG rendern")
+    p.add_argument("--data", default="data")
+    p.add_argument("--dataset", action="append")
+    p.add_argument("--method", action="append")
+    p.add_argument("--out", default="output_visuals")
+    p.add_argument("--cache", default=".mask_cache")
+    p.add_argument("--no-cache", action="store_true")
+    p.add_argument("--thumbnail", type=int, default=None)
+    p.add_argument("--overlay", action="store_true", help="Konturen statt Maskenpanels")
+    p.set_defaults(func=cmd_visualize)
+
+    p = sub.add_parser("report", help="Vergleichsplots aus einer Dice-Score-CSV")
+    p.add_argument("--csv", default=os.path.join("results", "dice_scores.csv"))
+    p.add_argument("--out", default="results")
+    p.set_defaults(func=cmd_report)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+import os
+import re
+import itertools
+import numpy as np
+import pandas as pd
+from skimage import img_as_ubyte
+from skimage.exposure import histogram
+from skimage.filters import threshold_local, threshold_multiotsu
+from tqdm import tqdm
+
+from src.load_image_pair import load_image_and_gt
+from src.dataset_catalog import match_pairs
+from src.packed_mask import PackedMask
+from process_image import (
+    METHODS, apply_local_otsu, apply_tiled_otsu, apply_skimage_local, apply_skimage_multiotsu
+)
+
+
+def parameter_grid(grid: dict) -> list:
+    """
+    Alle Kombinationen eines Parametergitters {Name: [Werte]} als Liste von Dicts.
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def _sweep_u8(func):
+    """
+    Methoden, die intern nach uint8 umrechnen: Umrechnung einmal pro Bild.
+    """
+    def sweep(image, combos):
+        img_u8 = img_as_ubyte(image)
+        for params in combos:
+            yield params, func(img_u8, **params)
+    return sweep
+
+
+def _sweep_skimage_local(image, combos):
+    # threshold_local = Gauß-Mittel(block_size) - offset → einmal je block_size filtern
+    img_f = image.astype(np.float64)
+    base = {}
+    for params in combos:
+        key = (params["block_size"], params.get("method", "gaussian"))
+        if key not in base:
+            base[key] = threshold_local(img_f, key[0], method=key[1], offset=0.0)
+        yield params, (image > base[key] - params.get("offset", 0.0)).astype(np.uint8)
+
+
+def _sweep_skimage_multiotsu(image, combos):
+    # Histogramm einmal pro Bild statt je classes-Wert
+    hist = histogram(image.reshape(-1), 256, source_range="image", normalize=True)
+    for params in combos:
+        thresholds = threshold_multiotsu(hist=hist, classes=params["classes"])
+        yield params, (image > thresholds[0]).astype(np.uint8)
+
+
+# Methodenfunktion → Sweep mit geteilten Zwischenergebnissen
+SWEEP_STRATEGIES = {
+    apply_local_otsu: _sweep_u8(apply_local_otsu),
+    apply_tiled_otsu: _sweep_u8(apply_tiled_otsu),
+    apply_skimage_local: _sweep_skimage_local,
+    apply_skimage_multiotsu: _sweep_skimage_multiotsu,
+}
+
+
+def sweep_image(image: np.ndarray, gt_mask: np.ndarray, method: str, grid: dict) -> list:
+    """
+    Dice Scores einer Methode für alle Kombinationen eines Parametergitters
+    auf einem bereits geladenen Bild.
+
+    Die Registry-Parameter der Methode sind der Ausgangspunkt, das Gitter
+    überschreibt sie. Für registrierte Methoden in SWEEP_STRATEGIES werden
+    Zwischenergebnisse (uint8-Umrechnung, Histogramm, lokaler Mittelwert je
+    block_size) über alle Kombinationen geteilt; sonst wird die Methode je
+    Kombination aufgerufen.
+
+    Returns:
+        Liste von Records {Methode, <Parameter>, Dice Score}
+    """
+    func, base_params, _ = METHODS[method]
+    combos = [{**base_params, **params} for params in parameter_grid(grid)]
+    strategy = SWEEP_STRATEGIES.get(func)
+    if strategy is None:
+        results = ((params, func(image, **params)) for params in combos)
+    else:
+        results = strategy(image, combos)
+
+    gt = PackedMask.from_array(gt_mask)
+    records = []
+    for params, mask in results:
+        record = {"Methode": method, **{name: params[name] for name in grid}}
+        record["Dice Score"] = float(gt.dice(mask))
+        records.append(record)
+    return records
+
+
+def run_parameter_sweep(img_dir, gt_dir, method: str, grid: dict, dataset=None, pairs=None) -> pd.DataFrame:
+    """
+    Parametersuche über alle Bild-GT-Paare eines Datensatzes.
+
+    Jedes Bild und jede GT wird genau einmal geladen; pro Bild läuft danach
+    das ganze Gitter (siehe sweep_image).
+
+    Args:
+        img_dir: Ordner mit Eingabebildern
+        gt_dir: Ordner mit Ground Truth
+        method: registrierter Methodenname (siehe process_image.METHODS)
+        grid: Parametergitter {Parametername: [Werte]}
+        dataset: Optionaler Datensatzname (für GT-Zuordnung / Export)
+        pairs: Optionale, bereits zugeordnete Liste (Bildpfad, GT-Pfad)
+
+    Returns:
+        DataFrame mit einer Zeile je Bild × Parameterkombination
+    """
+    if pairs is None:
+        pairs, missing = match_pairs(img_dir, gt_dir, dataset)
+        for basename in missing:
+            print(f"⚠️  Ground Truth fehlt für {basename}, überspringe.")
+
+    records = []
+    for img_path, gt_path in tqdm(pairs, desc=f"Sweep {method}"):
+        image, gt_mask = load_image_and_gt(img_path, gt_path, mmap=True)
+        for record in sweep_image(image, gt_mask, method, grid):
+            record["Bild"] = os.path.basename(img_path)
+            if dataset:
+                record["Datensatz"] = dataset
+            records.append(record)
+
+    return pd.DataFrame(records)
+
+
+def summarize_sweep(df: pd.DataFrame, grid: dict) -> pd.DataFrame:
+    """
+    Dice-vs-Parameter-Tabelle: mittlerer Dice Score je Parameterkombination,
+    absteigend sortiert.
+    """
+    keys = (["Datensatz"] if "Datensatz" in df else []) + ["Methode"] + list(grid)
+    summary = df.groupby(keys)["Dice Score"].agg(["mean", "std", "count"]).reset_index()
+    return summary.sort_values("mean", ascending=False, ignore_index=True)
+
+
+if __name__ == "__main__":
+    from src.dataset_catalog import DatasetCatalog
+
+    sweeps = {
+        "Otsu Local (skimage)": {"block_size": [15, 35, 75, 151], "offset": [0.0, -5.0, 5.0]},
+        "Multi-Otsu (skimage)": {"classes": [2, 3]},
+        "Otsu Tiled (custom)": {"tile_size": [64, 128, 256]},
+    }
+
+    catalog = DatasetCatalog("data")
+    os.makedirs("results", exist_ok=True)
+    for method, grid in sweeps.items():
+        df = pd.concat([
+            run_parameter_sweep(*catalog.dirs(ds), method, grid, dataset=ds, pairs=catalog.pairs(ds))
+            for ds in catalog.datasets()
+        ], ignore_index=True)
+        summary = summarize_sweep(df, grid)
+        name = re.sub(r"\W+", "_", method.lower()).strip("_")
+        summary.to_csv(f"results/sweep_{name}.csv", index=False)
+        print(summary)
@@ -1,15 +1,22 @@
+import os
+import contextvars
 import numpy as np
-from skimage.filters import threshold_otsu, threshold_local, threshold_multiotsu
+from concurrent.futures import ThreadPoolExecutor
 
 from src.otsu_global import apply_global_otsu
-from src.otsu_local import local_otsu
+from src.otsu_local import local_otsu, tiled_otsu
 from src.load_image_pair import load_image_and_gt
+from src.packed_mask import PackedMask
+from src import tracing
+from src.frame_stream import segment_stream
+from src.otsu_temporal import TemporalOtsu
 
 
 def apply_skimage_global(image: np.ndarray) -> np.ndarray:
     """
     Globales Otsu aus skimage.filters.
     """
+    from skimage.filters import threshold_otsu
     t = threshold_otsu(image)
     return (image > t).astype(np.uint8)
 
@@ -18,6 +25,7 @@ def apply_skimage_local(image: np.ndarray, block_size: int = 35, offset: float =
     """
     Lokales Thresholding mit skimage.filters.threshold_local.
     """
+    from skimage.filters import threshold_local
     local_thresh = threshold_local(image, block_size, offset=offset)
     return (image > local_thresh).astype(np.uint8)
 
@@ -28,23 +36,148 @@ def apply_skimage_multiotsu(image: np.ndarray, classes: int = 2) -> np.ndarray:
     Für 2 Klassen ≈ einfaches Otsu, für 3+ auch z. B. Hintergrund / Zytoplasma / Zellkern.
     Gibt binäre Maske zurück: alles oberhalb erster Schwelle.
     """
+    from skimage.filters import threshold_multiotsu
     thresholds = threshold_multiotsu(image, classes=classes)
     return (image > thresholds[0]).astype(np.uint8)
 
 
-def process_all_methods(image: np.ndarray) -> dict:
+def apply_local_otsu(image: np.ndarray, radius: int = 3) -> np.ndarray:
     """
-    Wendet alle Segmentierungsmethoden auf das Bild an.
+    Eigenes lokales Otsu (gleitendes Fenster) als Binärmaske.
+    """
+    _, mask = local_otsu(image, radius=radius)
+    return mask.astype(np.uint8)
+
+
+def apply_tiled_otsu(image: np.ndarray, tile_size: int = 128) -> np.ndarray:
+    """
+    Eigenes kachelbasiertes Otsu als Binärmaske.
+    """
+    _, mask = tiled_otsu(image, tile_size=tile_size)
+    return mask.astype(np.uint8)
+
+
+# Registry: Methode → (Funktion, Parameter, Kostenhinweis)
+# Kostenhinweis = grobe relative Laufzeit (globales Otsu ≈ 1)
+METHODS = {}
+
+
+def register_method(name: str, func, cost: float = 1.0, **params) -> None:
+    """
+    Registriert eine Segmentierungsmethode für process_all_methods.
+
+    Args:
+        name: Anzeigename (Spalte "Methode" in den Ergebnissen)
+        func: Funktion image → Binärmaske, wird mit **params aufgerufen
+        cost: relativer Kostenhinweis für Auswahl (max_cost) und Scheduling
+        params: Parameter der Methode (gehen auch in den Cache-Schlüssel ein)
+    """
+    METHODS[name] = (func, params, cost)
+
+
+register_method("Otsu Global (custom)", apply_global_otsu, cost=1)
+register_method("Otsu Local (custom)", apply_local_otsu, cost=100, radius=3)
+register_method("Otsu Tiled (custom)", apply_tiled_otsu, cost=2, tile_size=128)
+register_method("Otsu Global (skimage)", apply_skimage_global, cost=1)
+register_method("Otsu Local (skimage)", apply_skimage_local, cost=10, block_size=35, offset=0.0)
+register_method("Multi-Otsu (skimage)", apply_skimage_multiotsu, cost=5, classes=2)
+
+
+def select_methods(methods=None, max_cost=None) -> list:
+    """
+    Bestimmt die auszuführenden Methoden in Registry-Reihenfolge.
+
+    Neben den Argumenten werden zwei Umgebungsvariablen ausgewertet, damit
+    Methoden ohne Codeänderung abgeschaltet werden können:
+        OTSU_DISABLED_METHODS: kommagetrennte Methodennamen
+        OTSU_MAX_COST: Methoden mit höherem Kostenhinweis überspringen
+    """
+    names = list(METHODS) if methods is None else list(methods)
+    unknown = [name for name in names if name not in METHODS]
+    if unknown:
+        raise KeyError(f"Unbekannte Methode(n): {', '.join(unknown)}")
+
+    disabled = {n.strip() for n in os.environ.get("OTSU_DISABLED_METHODS", "").split(",") if n.strip()}
+    if max_cost is None and os.environ.get("OTSU_MAX_COST"):
+        max_cost = float(os.environ["OTSU_MAX_COST"])
+
+    return [
+        name for name in names
+        if name not in disabled and (max_cost is None or METHODS[name][2] <= max_cost)
+    ]
+
+
+def process_all_methods(image: np.ndarray, cache=None, methods=None, max_cost=None, workers: int = 1,
+                        packed: bool = False) -> dict:
+    """
+    Wendet alle (bzw. die ausgewählten) Segmentierungsmethoden auf das Bild an.
+
+    Args:
+        image: Graustufenbild
+        cache: optionaler MaskCache; bereits berechnete Masken (gleicher
+               Bildinhalt, gleiche Parameter, gleiche Code-Version) werden
+               von der Festplatte geladen statt neu berechnet
+        methods: optionale Liste von Methodennamen (Standard: alle registrierten)
+        max_cost: Methoden mit höherem Kostenhinweis überspringen
+        workers: Anzahl der Threads; NumPy / skimage geben den GIL größtenteils
+                 frei, sodass die Methoden bei > 1 gleichzeitig laufen
+        packed: Masken bit-gepackt als PackedMask zurückgeben (1 Bit pro Pixel);
+                Cache-Treffer werden dann nicht entpackt
+
+    Returns:
+        Dictionary mit Methode → Binärbild (np.ndarray bzw. PackedMask)
+    """
+    names = select_methods(methods, max_cost)
+    image_hash = cache.image_hash(image) if cache is not None else None
+
+    def run(name):
+        func, params, _ = METHODS[name]
+        with tracing.context(method=name), tracing.span("method"):
+            if cache is not None:
+                return cache.get_or_compute(image, name, func, params, image_hash=image_hash, packed=packed)
+            mask = func(image, **params)
+            return PackedMask.from_array(mask) if packed else mask
+
+    if workers > 1 and len(names) > 1:
+        # Teure Methoden zuerst starten, Ergebnis in Registry-Reihenfolge
+        by_cost = sorted(names, key=lambda name: METHODS[name][2], reverse=True)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Trace-Kontext (Datensatz, Bild) an die Threads weitergeben
+            futures = {name: executor.submit(contextvars.copy_context().run, run, name) for name in by_cost}
+            return {name: futures[name].result() for name in names}
+
+    return {name: run(name) for name in names}
+
+
+# Methoden mit zeitlicher Wiederverwendung (process_stream(..., temporal=True))
+TEMPORAL_MODES = {
+    "Otsu Global (custom)": "global",
+    "Otsu Tiled (custom)": "tiled",
+}
+
+
+def process_stream(source, out_path, method: str = "Otsu Global (custom)", read_ahead: int = 2,
+                   temporal: bool = False) -> int:
+    """
+    Segmentiert eine Zeitserie (mehrseitiges TIFF, .npy-Stapel oder
+    Bildverzeichnis) Bild für Bild mit einer registrierten Methode.
+
+    Die Masken werden fortlaufend nach out_path geschrieben; der Speicherbedarf
+    hängt nicht von der Länge der Serie ab. Mit temporal=True werden Histogramm
+    und Schwelle des Vorgängerbildes weiterverwendet (nur Methoden in
+    TEMPORAL_MODES, siehe TemporalOtsu).
 
     Returns:
-        Dictionary mit Methode → Binärbild (np.ndarray)
+        Anzahl der verarbeiteten Zeitpunkte
     """
-    _, local_mask = local_otsu(image)
+    func, params, _ = METHODS[method]
+    if temporal:
+        if method not in TEMPORAL_MODES:
+            raise KeyError(f"Kein zeitlicher Modus für {method}")
+        func = TemporalOtsu(TEMPORAL_MODES[method], **params)
+        params = {}
 
-    return {
-        "Otsu Global (custom)": apply_global_otsu(image),
-        "Otsu Local (custom)": local_mask.astype(np.uint8),
-        "Otsu Global (skimage)": apply_skimage_global(image),
-        "Otsu Local (skimage)": apply_skimage_local(image),
-        "Multi-Otsu (skimage)": apply_skimage_multiotsu(image)
-    }
+    n_frames = 0
+    for _ in segment_stream(source, func, out_path, read_ahead=read_ahead, **params):
+        n_frames += 1
+    return n_frames
@@ -0,0 +1,67 @@
+import os
+
+
+def create_report(csv_path: str, results_dir: str) -> None:
+    """
+    Erstellt die Vergleichsplots (Boxplot, Heatmap, Scatterplots) aus einer
+    Dice-Score-Tabelle und speichert sie als PNG in results_dir.
+
+    pandas, matplotlib und seaborn werden erst hier importiert, damit
+    Segmentierung und Auswertung ohne diese Bibliotheken starten.
+
+    Args:
+        csv_path: Pfad zur CSV mit den Spalten Bild, Methode, Dice Score
+        results_dir: Zielverzeichnis der Abbildungen
+    """
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    print("📈 Erstelle Vergleichsplots")
+    df = pd.read_csv(csv_path)
+    os.makedirs(results_dir, exist_ok=True)
+
+    # Boxplot
+    plt.figure(figsize=(10, 6))
+    sns.boxplot(data=df, x="Methode", y="Dice Score")
+    plt.xticks(rotation=45)
+    plt.title("Verteilung der Dice Scores je Methode")
+    plt.tight_layout()
+    plt.savefig(os.path.join(results_dir, "dice_scores_boxplot.png"), dpi=150)
+    plt.close()
+
+    # Heatmap
+    df_pivot = df.pivot(index="Bild", columns="Methode", values="Dice Score")
+    plt.figure(figsize=(12, 8))
+    sns.heatmap(df_pivot, annot=True, fmt=".2f", cmap="viridis", linewidths=0.5)
+    plt.title("Heatmap der Dice Scores")
+    plt.tight_layout()
+    plt.savefig(os.path.join(results_dir, "dice_scores_heatmap.png"), dpi=150)
+    plt.close()
+
+    # Scatterplots für Global/Local-Vergleich
+    def plot_scatter(methods, title, filename, color):
+        if not set(methods) <= set(df["Methode"]):
+            return  # Methode nicht ausgewertet (z. B. abgeschaltet)
+        df_sub = df[df["Methode"].isin(methods)]
+        pivot = df_sub.pivot(index="Bild", columns="Methode", values="Dice Score")
+        plt.figure(figsize=(6, 6))
+        plt.scatter(pivot[methods[0]], pivot[methods[1]], color=color, s=60)
+        plt.plot([0, 1], [0, 1], 'r--', label="Ideal: x = y")
+        plt.xlabel(f"Dice Score – {methods[0]}")
+        plt.ylabel(f"Dice Score – {methods[1]}")
+        plt.title(title)
+        plt.grid(True)
+        plt.legend()
+        plt.tight_layout()
+        plt.savefig(os.path.join(results_dir, filename), dpi=150)
+        plt.close()
+
+    plot_scatter(["Otsu Local (custom)", "Otsu Local (skimage)"],
+                 "Vergleich der Otsu Local Methoden", "otsu_local_scatterplot.png", "green")
+
+    plot_scatter(["Otsu Global (custom)", "Otsu Global (skimage)"],
+                 "Vergleich der Otsu Global Methoden", "otsu_global_scatterplot.png", "blue")
+
+    plot_scatter(["Otsu Local (custom)", "Otsu Tiled (custom)"],
+                 "Vergleich Otsu Local (Fenster) vs. Tiled", "otsu_tiled_scatterplot.png", "purple")
@@ -1,78 +1,221 @@
 import os
-import pandas as pd
-from glob import glob
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 
 from src.load_image_pair import load_image_and_gt
-from process_image import process_all_methods
-from evaluate_segmentation import evaluate_segmentations
+from process_image import process_all_methods, select_methods, METHODS
+from evaluate_segmentation import score_segmentations
+from src.render_panels import render_segmentations
+from src.mask_cache import MaskCache
+from src.dataset_catalog import match_pairs
+from src import tracing
 
 
-def run_batch_evaluation(img_dir, gt_dir, dataset=None):
+def evaluate_image_pair(img_path, gt_path, dataset=None, visual_dir=None, cache=None,
+                        instance_dice=False, methods=None, thumbnail=None):
     """
-    Führt die Segmentierung und Auswertung für alle Bild-GT-Paare durch.
+    Lädt ein Bild-GT-Paar einmal, berechnet jede Methode einmal und verwendet
+    die Masken sowohl für die Dice Scores als auch (optional) für die Visualisierung.
 
     Args:
-        img_dir: Verzeichnis mit Input-Bildern
-        gt_dir: Verzeichnis mit Ground-Truth-Bildern
+        img_path: Pfad zum Eingabebild
+        gt_path: Pfad zur Ground Truth
         dataset: Optionaler Datensatzname (für Logging / Export)
+        visual_dir: Optionales Verzeichnis für die Visualisierung als PNG
+        cache: Optionaler MaskCache für bereits berechnete Masken
+        instance_dice: zusätzlich den Instanz-Dice gegen die GT-Labels berechnen
+        methods: optionale Teilmenge der Methoden (Standard: alle ausgewählten)
+        thumbnail: optionale maximale Kantenlänge je Panel der Visualisierung
 
     Returns:
-        DataFrame mit allen Dice Scores (Bild × Methode)
+        Liste von Records mit Bild, Methode, Dice Score (plus Datensatz)
     """
-    records = []
+    basename = os.path.basename(img_path)
 
-    # Alle vorhandenen GT-Dateinamen (ohne Endung) merken
-    gt_names = set(os.path.splitext(f)[0] for f in os.listdir(gt_dir))
+    with tracing.context(dataset=dataset or "", image=basename):
+        return _evaluate_image_pair(img_path, gt_path, basename, dataset, visual_dir, cache,
+                                    instance_dice, methods, thumbnail)
 
-    # Alle Bilder erfassen
-    img_paths = []
-    for ext in ["*.tif", "*.png"]:
-        img_paths.extend(glob(os.path.join(img_dir, ext)))
-    img_paths.sort()
 
-    for img_path in tqdm(img_paths, desc="Verarbeite Bilder"):
-        basename = os.path.basename(img_path)
-
-        # Zuordnung der GT-Datei
-        if dataset == "NIH3T3":
-            num = basename.replace("dna-", "").replace(".png", "")
-            gt_filename = f"{num}.png"
+def _evaluate_image_pair(img_path, gt_path, basename, dataset, visual_dir, cache, instance_dice, methods,
+                         thumbnail):
+    # Lade Bild & GT (unkomprimierte TIFF/NPY speicherabgebildet im nativen dtype)
+    with tracing.span("decode"):
+        if instance_dice:
+            image, gt_mask, gt_labels = load_image_and_gt(img_path, gt_path, return_labels=True, mmap=True)
         else:
-            num = ''.join(filter(str.isdigit, basename))
-            gt_filename = f"man_seg{num}.tif"
+            image, gt_mask = load_image_and_gt(img_path, gt_path, mmap=True)
+            gt_labels = None
 
-        gt_path = os.path.join(gt_dir, gt_filename)
+    # Segmentierungen berechnen
+    predictions = process_all_methods(image, cache=cache, methods=methods, packed=True)
 
-        if not os.path.exists(gt_path):
-            print(f"⚠️  Ground Truth fehlt für {basename}, überspringe.")
-            continue
+    # Dice Scores berechnen
+    with tracing.span("dice"):
+        scores = score_segmentations(gt_mask, predictions, gt_labels)
+
+    # Metadaten ergänzen
+    for record in scores:
+        record["Bild"] = basename
+        if dataset:
+            record["Datensatz"] = dataset
 
-        try:
-            # Lade Bild & GT
-            image, gt_mask = load_image_and_gt(img_path, gt_path)
+    if visual_dir:
+        save_path = os.path.join(visual_dir, f"{dataset}_{basename}.png")
+        with tracing.span("render"):
+            render_segmentations(image, gt_mask, predictions, save_path, thumbnail=thumbnail)
 
-            # Segmentierungen berechnen
-            predictions = process_all_methods(image)
+    return scores
 
-            # Dice Scores berechnen
-            scores = evaluate_segmentations(gt_mask, predictions)
 
-            # Metadaten ergänzen
-            scores["Bild"] = basename
-            if dataset:
-                scores["Datensatz"] = dataset
+# Ein MaskCache je Worker-Prozess und Cache-Verzeichnis (statt einer Instanz pro Bild)
+_worker_caches = {}
 
-            records.append(scores)
 
-        except Exception as e:
-            print(f"❌ Fehler bei {basename}: {e}")
+def _worker_cache(cache_dir):
+    if cache_dir not in _worker_caches:
+        _worker_caches[cache_dir] = MaskCache(cache_dir)
+    return _worker_caches[cache_dir]
+
+
+def _evaluate_task(args):
+    """
+    Worker-Funktion für den Prozess-Pool: wertet ein Bild-GT-Paar aus und gibt
+    nur die Dice Scores (keine Masken) sowie die Trace-Events des Workers an
+    den Hauptprozess zurück.
+    """
+    img_path, gt_path, dataset, visual_dir, cache_dir, instance_dice, methods, thumbnail = args
+    cache = _worker_cache(cache_dir) if cache_dir else None
+    try:
+        scores = evaluate_image_pair(img_path, gt_path, dataset=dataset, visual_dir=visual_dir,
+                                     cache=cache, instance_dice=instance_dice, methods=methods,
+                                     thumbnail=thumbnail)
+        return scores, None, tracing.collect()
+    except Exception as e:
+        return None, f"❌ Fehler bei {os.path.basename(img_path)}: {e}", tracing.collect()
+
+
+def run_batch_evaluation(img_dir, gt_dir, dataset=None, visual_dir=None, cache_dir=None, workers=1,
+                         instance_dice=False, writer=None, manifest=None, pairs=None, thumbnail=None):
+    """
+    Führt die Segmentierung und Auswertung für alle Bild-GT-Paare durch.
+
+    Args:
+        img_dir: Verzeichnis mit Input-Bildern
+        gt_dir: Verzeichnis mit Ground-Truth-Bildern
+        dataset: Optionaler Datensatzname (für Logging / Export)
+        visual_dir: Optionales Verzeichnis; wenn gesetzt, werden die Masken
+                    im selben Durchlauf auch visualisiert (fensterlos per
+                    render_segmentations, auch in Worker-Prozessen)
+        cache_dir: Optionales Verzeichnis für den Masken-Cache (MaskCache)
+        workers: Anzahl der Prozesse; bei > 1 werden die Bild-GT-Paare auf einen
+                 Prozess-Pool verteilt (Reihenfolge der Ergebnisse bleibt erhalten)
+        instance_dice: zusätzliche Spalte "Instanz Dice Score" (Dice je GT-Instanz)
+        writer: Optionaler ResultsWriter; die Zeilen werden dann nach jedem Bild
+                angehängt statt im Speicher gesammelt; ohne manifest werden
+                bereits geschriebene Bilder übersprungen (Fortsetzen nach
+                Abbruch), mit manifest sollte er ohne resume geöffnet werden
+        manifest: Optionales RunManifest; pro Bild werden nur Methoden berechnet,
+                  deren (Datensatz, Bild, Methode, Parameter)-Einheit fehlt oder
+                  sich geändert hat, alle anderen Ergebnisse kommen aus dem Manifest
+        pairs: Optionale, bereits zugeordnete Liste (Bildpfad, GT-Pfad), z. B. aus
+               DatasetCatalog; dann werden img_dir / gt_dir nicht erneut gescannt
+        thumbnail: optionale maximale Kantenlänge je Panel der Visualisierung
+
+    Returns:
+        DataFrame mit allen Dice Scores (Bild × Methode);
+        None, wenn ein writer übergeben wurde (die Zeilen stehen dann in dessen Datei)
+    """
+    records = []
+
+    # Bild-GT-Paare zuordnen (ein Verzeichnis-Scan je img/ und gt/)
+    if pairs is None:
+        pairs, missing = match_pairs(img_dir, gt_dir, dataset)
+        for basename in missing:
+            print(f"⚠️  Ground Truth fehlt für {basename}, überspringe.")
+
+    # Ohne Manifest: bereits geschriebene Bilder überspringen. Mit Manifest
+    # entscheidet dessen Fingerabdruck, geänderte Bilder werden neu berechnet.
+    if writer is not None and manifest is None:
+        pairs = [(img_path, gt_path) for img_path, gt_path in pairs
+                 if (dataset or "", os.path.basename(img_path)) not in writer.completed()]
+
+    def collect(scores):
+        if writer is not None:
+            writer.write(scores)
+        else:
+            records.extend(scores)
+
+    # Jobs: (Bildpfad, GT-Pfad, zu berechnende Methoden, Fingerabdrücke)
+    jobs = []
+    for img_path, gt_path in pairs:
+        if manifest is None:
+            jobs.append((img_path, gt_path, None, None))
+            continue
+
+        basename = os.path.basename(img_path)
+        fingerprints = {
+            name: manifest.fingerprint(img_path, gt_path, METHODS[name][0], METHODS[name][1],
+                                       extra=instance_dice)
+            for name in select_methods()
+        }
+        todo = manifest.pending(dataset, basename, fingerprints)
+        if not todo:
+            collect(manifest.results(dataset, basename, list(fingerprints)))
             continue
+        if visual_dir:
+            todo = list(fingerprints)  # Visualisierung braucht alle Masken
+        jobs.append((img_path, gt_path, todo, fingerprints))
+
+    def finish(job, scores):
+        img_path, _, _, fingerprints = job
+        if manifest is not None:
+            basename = os.path.basename(img_path)
+            for record in scores:
+                manifest.record(dataset, basename, record["Methode"],
+                                fingerprints[record["Methode"]], record)
+            scores = manifest.results(dataset, basename, list(fingerprints))
+        collect(scores)
+
+    if workers > 1:
+        tasks = [(img_path, gt_path, dataset, visual_dir, cache_dir, instance_dice, methods, thumbnail)
+                 for img_path, gt_path, methods, _ in jobs]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(_evaluate_task, tasks)
+            for job, (scores, error, events) in tqdm(zip(jobs, results), total=len(tasks), desc="Verarbeite Bilder"):
+                tracing.add_events(events)
+                if error:
+                    print(error)
+                else:
+                    finish(job, scores)
+    else:
+        cache = MaskCache(cache_dir) if cache_dir else None
+        for job in tqdm(jobs, desc="Verarbeite Bilder"):
+            img_path, gt_path, methods, _ = job
+            try:
+                scores = evaluate_image_pair(img_path, gt_path, dataset=dataset, visual_dir=visual_dir,
+                                             cache=cache, instance_dice=instance_dice, methods=methods,
+                                             thumbnail=thumbnail)
+                finish(job, scores)
+
+            except Exception as e:
+                print(f"❌ Fehler bei {os.path.basename(img_path)}: {e}")
+                continue
+
+    if writer is not None:
+        return None
+
+    import pandas as pd  # nur für den Rückgabe-DataFrame
+
+    columns = ["Bild", "Methode", "Dice Score"]
+    if instance_dice:
+        columns.append("Instanz Dice Score")
+    if dataset:
+        columns.append("Datensatz")
 
     if not records:
         print(f"⚠️  Keine gültigen Bild-GT-Paare in {img_dir}")
-        return pd.DataFrame(columns=["Bild", "Methode", "Dice Score", "Datensatz"])
+        return pd.DataFrame(columns=columns)
 
-    # Alle Scores zusammenführen
-    df_all = pd.concat(records, ignore_index=True)
-    return df_all[["Bild", "Methode", "Dice Score", "Datensatz"] if dataset else ["Bild", "Methode", "Dice Score"]]
+    # Alle Scores einmalig in einen DataFrame überführen
+    return pd.DataFrame.from_records(records, columns=columns)
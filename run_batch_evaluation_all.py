@@ -1,23 +1,25 @@
 from run_batch_evaluation import run_batch_evaluation
 import os
 import pandas as pd
+from src.dataset_catalog import DatasetCatalog
 
 if __name__ == "__main__":
     base_data_dir = "data"
     all_dfs = []
 
-    for dataset_name in os.listdir(base_data_dir):
-        dataset_path = os.path.join(base_data_dir, dataset_name)
-        img_dir = os.path.join(dataset_path, "img")
-        gt_dir  = os.path.join(dataset_path, "gt")
+    catalog = DatasetCatalog(base_data_dir)
+    for dataset_name in catalog.skipped:
+        print(f"⚠️  Überspringe {dataset_name}, 'img/' oder 'gt/' fehlt.")
 
-        if not (os.path.isdir(img_dir) and os.path.isdir(gt_dir)):
-            print(f"⚠️  Überspringe {dataset_name}, 'img/' oder 'gt/' fehlt.")
-            continue
+    for dataset_name in catalog.datasets():
+        img_dir, gt_dir = catalog.dirs(dataset_name)
+        for basename in catalog.missing(dataset_name):
+            print(f"⚠️  Ground Truth fehlt für {basename}, überspringe.")
 
         print(f"📂 Verarbeite Datensatz: {dataset_name}")
         try:
-            df = run_batch_evaluation(img_dir, gt_dir, dataset=dataset_name)
+            df = run_batch_evaluation(img_dir, gt_dir, dataset=dataset_name,
+                                      pairs=catalog.pairs(dataset_name))
             all_dfs.append(df)
         except Exception as e:
             print(f"   ❌ Fehler bei {dataset_name}: {e}")
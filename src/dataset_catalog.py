@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Unterstützte Bildformate
+IMAGE_EXTENSIONS = (".tif", ".png")
+
+INDEX_FILENAME = ".catalog.json"
+
+
+def _nih3t3_gt_name(image_name: str) -> str:
+    # z. B. dna-0.png → 0.png
+    num = image_name.replace("dna-", "").replace(".png", "")
+    return f"{num}.png"
+
+
+def _ctc_gt_name(image_name: str) -> str:
+    # z. B. t01.tif → man_seg01.tif (Cell Tracking Challenge)
+    num = ''.join(filter(str.isdigit, image_name))
+    return f"man_seg{num}.tif"
+
+
+# Datensatzname → Regel Bilddateiname → GT-Dateiname
+NAMING_RULES: Dict[str, Callable[[str], str]] = {
+    "NIH3T3": _nih3t3_gt_name,
+}
+DEFAULT_NAMING_RULE = _ctc_gt_name
+
+
+def register_naming_rule(dataset: str, rule: Callable[[str], str]) -> None:
+    """
+    Registriert eine Zuordnungsregel Bild → GT-Dateiname für einen Datensatz.
+    """
+    NAMING_RULES[dataset] = rule
+
+
+def match_pairs(
+    img_dir: str, gt_dir: str, dataset: Optional[str] = None
+) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """
+    Ordnet Bildern ihre GT-Dateien zu – mit je einem Verzeichnis-Scan für img/
+    und gt/ statt einem os.path.exists pro Bild.
+
+    Returns:
+        pairs: sortierte Liste (Bildpfad, GT-Pfad)
+        missing: Bilddateinamen ohne passende GT
+    """
+    rule = NAMING_RULES.get(dataset, DEFAULT_NAMING_RULE)
+    with os.scandir(gt_dir) as it:
+        gt_names = {e.name for e in it if e.is_file()}
+    with os.scandir(img_dir) as it:
+        img_names = sorted(e.name for e in it if e.name.endswith(IMAGE_EXTENSIONS) and e.is_file())
+
+    pairs, missing = [], []
+    for name in img_names:
+        gt_name = rule(name)
+        if gt_name in gt_names:
+            pairs.append((os.path.join(img_dir, name), os.path.join(gt_dir, gt_name)))
+        else:
+            missing.append(name)
+    return pairs, missing
+
+
+def rule_version(rule: Callable[[str], str]) -> str:
+    """
+    Kennung einer Zuordnungsregel aus Modul, Name und Bytecode; ändert sich auch
+    bei Lambdas, sobald sich ihr Code ändert.
+    """
+    code = getattr(rule, "__code__", None)
+    payload = f"{getattr(rule, '__module__', '')}.{getattr(rule, '__qualname__', repr(rule))}"
+    h = hashlib.blake2b(payload.encode(), digest_size=8)
+    if code is not None:
+        h.update(code.co_code)
+        h.update(repr(code.co_consts).encode())
+    return h.hexdigest()
+
+
+class DatasetCatalog:
+    """
+    Index aller Bild-GT-Paare unter einem Datenverzeichnis (data/<Datensatz>/img|gt).
+
+    Jeder Datensatz wird einmal gescannt; das Ergebnis wird mit den
+    Änderungszeiten der Verzeichnisse in data/.catalog.json gespeichert. Bei
+    späteren Läufen werden nur Datensätze neu gescannt, deren img/- oder
+    gt/-Verzeichnis sich geändert hat (Dateien hinzugefügt / entfernt).
+    Gespeichert werden nur Dateinamen; die Pfade entstehen erst in pairs() aus
+    base_dir, sodass der Index auch aus einem anderen Arbeitsverzeichnis gilt.
+    """
+
+    def __init__(self, base_dir: str = "data", index_path: Optional[str] = None, persist: bool = True):
+        self.base_dir = base_dir
+        self.index_path = index_path or os.path.join(base_dir, INDEX_FILENAME)
+        self.persist = persist
+        self._index: Dict[str, dict] = {}
+        self.skipped: List[str] = []
+        self._load()
+
+    def datasets(self) -> List[str]:
+        return sorted(self._index)
+
+    def pairs(self, dataset: str) -> List[Tuple[str, str]]:
+        img_dir, gt_dir = self.dirs(dataset)
+        return [(os.path.join(img_dir, img_name), os.path.join(gt_dir, gt_name))
+                for img_name, gt_name in self._index[dataset]["names"]]
+
+    def missing(self, dataset: str) -> List[str]:
+        return list(self._index[dataset]["missing"])
+
+    def dirs(self, dataset: str) -> Tuple[str, str]:
+        root = os.path.join(self.base_dir, dataset)
+        return os.path.join(root, "img"), os.path.join(root, "gt")
+
+    def __iter__(self) -> Iterator[Tuple[str, str, str]]:
+        """
+        Iteriert über (Datensatz, Bildpfad, GT-Pfad).
+        """
+        for dataset in self.datasets():
+            for img_path, gt_path in self.pairs(dataset):
+                yield dataset, img_path, gt_path
+
+    def _load(self) -> None:
+        stored = {}
+        if self.persist and os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, encoding="utf-8") as f:
+                    stored = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                stored = {}
+
+        changed = False
+        with os.scandir(self.base_dir) as it:
+            names = sorted(e.name for e in it if e.is_dir())
+
+        for dataset in names:
+            img_dir, gt_dir = self.dirs(dataset)
+            try:
+                mtimes = [os.stat(img_dir).st_mtime_ns, os.stat(gt_dir).st_mtime_ns]
+            except FileNotFoundError:
+                self.skipped.append(dataset)
+                continue
+
+            rule = rule_version(NAMING_RULES.get(dataset, DEFAULT_NAMING_RULE))
+            entry = stored.get(dataset)
+            if (entry is None or "names" not in entry
+                    or entry.get("mtimes") != mtimes or entry.get("rule") != rule):
+                pairs, missing = match_pairs(img_dir, gt_dir, dataset)
+                names = [(os.path.basename(img), os.path.basename(gt)) for img, gt in pairs]
+                entry = {"mtimes": mtimes, "rule": rule, "names": names, "missing": missing}
+                changed = True
+            self._index[dataset] = entry
+
+        if self.persist and (changed or set(stored) != set(self._index)):
+            tmp_path = f"{self.index_path}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._index, f)
+                os.replace(tmp_path, self.index_path)
+            except OSError:
+                pass  # z. B. schreibgeschütztes Datenverzeichnis → Index nur im Speicher
+
+
+def iter_pairs(base_dir: str = "data") -> Iterator[Tuple[str, str, str]]:
+    """
+    Schneller Iterator über alle (Datensatz, Bildpfad, GT-Pfad) unter base_dir.
+    """
+    return iter(DatasetCatalog(base_dir))
@@ -1,13 +1,18 @@
 import numpy as np
-from skimage.io import imread
+from typing import Tuple
+from src.packed_mask import PackedMask
 
 def dice_score(pred: np.ndarray, target: np.ndarray) -> float:
     """
     Berechnet den Dice-Koeffizienten zwischen zwei binären Bildern (dtype=bool).
+    Ist eine der Masken ein PackedMask, wird per Popcount auf den Bits gerechnet.
     """
     if pred.shape != target.shape:
         raise ValueError("Die Eingabebilder haben unterschiedliche Formen.")
 
+    if isinstance(pred, PackedMask) or isinstance(target, PackedMask):
+        return PackedMask.from_array(pred).dice(target)
+
     intersection = np.logical_and(pred, target).sum()
     total = pred.sum() + target.sum()
 
@@ -16,7 +21,116 @@ def dice_score(pred: np.ndarray, target: np.ndarray) -> float:
 
     return 2 * intersection / total
 
+def dice_scores(preds: np.ndarray, target: np.ndarray) -> np.ndarray:
+    """
+    Dice-Koeffizienten mehrerer Masken gegen dieselbe Ground Truth in einem Durchlauf.
+
+    Statt jede Maske und die GT pro Methode nach bool zu kopieren, werden nur
+    die Vorhersagen an den GT-Pixeln gezählt (Schnittmenge) sowie die
+    Vorhersagen insgesamt (Summe).
+
+    Args:
+        preds: Masken (M, H, W) oder Liste von PackedMask (dann wird per
+               Popcount auf den gepackten Bits gezählt, ohne zu entpacken);
+               alles ≠ 0 gilt als Vordergrund
+        target: Ground-Truth-Maske (H, W), alles ≠ 0 gilt als Vordergrund
+
+    Returns:
+        Array (M,) mit Dice Scores
+    """
+    if len(preds) and isinstance(preds[0], PackedMask):
+        gt = PackedMask.from_array(target)
+        intersection = np.array([gt.intersection(p) for p in preds])
+        total = np.array([p.sum() for p in preds]) + gt.sum()
+    else:
+        if preds.shape[1:] != target.shape:
+            raise ValueError("Die Eingabebilder haben unterschiedliche Formen.")
+
+        flat = preds.reshape(len(preds), -1)
+        gt_idx = np.flatnonzero(target)
+
+        intersection = np.count_nonzero(flat[:, gt_idx], axis=1)
+        total = np.count_nonzero(flat, axis=1) + gt_idx.size
+
+    dice = np.ones(len(preds))  # Sonderfall: beide leer → perfekte Übereinstimmung
+    nonempty = total > 0
+    dice[nonempty] = 2 * intersection[nonempty] / total[nonempty]
+    return dice
+
+def prepare_gt_instances(gt_labels: np.ndarray) -> Tuple[np.ndarray, int, np.ndarray]:
+    """
+    Bereitet ein GT-Labelbild einmal für instance_dice_prepared auf, damit
+    Labeln und Zählen nicht für jede Methode wiederholt werden.
+
+    Enthält die GT nur Vorder-/Hintergrund (z. B. 0/255), werden ihre
+    Zusammenhangskomponenten als Instanzen verwendet.
+
+    Returns:
+        labels: flaches Instanz-Labelbild (int64), 0 = Hintergrund
+        n_gt: Anzahl der Labels inkl. Hintergrund (max + 1)
+        gt_sizes: Pixel je Label (n_gt,)
+    """
+    gt_labels = np.asarray(gt_labels)
+    if gt_labels.dtype == bool or len(np.unique(gt_labels)) <= 2:
+        from skimage.measure import label
+        gt_labels = label(gt_labels > 0)
+
+    labels = gt_labels.reshape(-1).astype(np.int64)
+    gt_sizes = np.bincount(labels)
+    return labels, len(gt_sizes), gt_sizes
+
+def instance_dice_prepared(pred: np.ndarray, labels: np.ndarray, n_gt: int, gt_sizes: np.ndarray) -> float:
+    """
+    Instanz-Dice mit einer per prepare_gt_instances aufbereiteten GT.
+    """
+    if np.asarray(pred).size != labels.size:
+        raise ValueError("Die Eingabebilder haben unterschiedliche Formen.")
+
+    from skimage.measure import label
+
+    pred_labels, n_pred = label(np.asarray(pred) > 0, return_num=True)
+
+    # Überlappungsmatrix (GT-Label × Vorhersage-Komponente) per bincount
+    joint = np.bincount(
+        labels * (n_pred + 1) + pred_labels.ravel(),
+        minlength=n_gt * (n_pred + 1)
+    ).reshape(n_gt, n_pred + 1)
+
+    sizes = gt_sizes[1:]
+    present = sizes > 0
+    if not present.any():
+        return 1.0 if n_pred == 0 else 0.0
+    if n_pred == 0:
+        return 0.0
+
+    overlaps = joint[1:, 1:]
+    best = np.argmax(overlaps, axis=1)
+    best_overlap = overlaps[np.arange(len(best)), best]
+    pred_sizes = joint.sum(axis=0)[1:][best]
+
+    dice = 2 * best_overlap / (sizes + pred_sizes)
+    return float(dice[present].mean())
+
+def instance_dice(pred: np.ndarray, gt_labels: np.ndarray) -> float:
+    """
+    Mittlerer Dice-Koeffizient über alle GT-Instanzen.
+
+    Jede GT-Instanz wird mit der Zusammenhangskomponente der Vorhersage
+    verglichen, mit der sie am stärksten überlappt. Enthält die GT nur
+    Vorder-/Hintergrund (z. B. 0/255), werden ihre Zusammenhangskomponenten
+    als Instanzen verwendet. Für mehrere Vorhersagen gegen dieselbe GT:
+    prepare_gt_instances + instance_dice_prepared.
+
+    Args:
+        pred: binäre Vorhersage (H, W)
+        gt_labels: Instanz-Labelbild (H, W), 0 = Hintergrund
+    """
+    if pred.shape != gt_labels.shape:
+        raise ValueError("Die Eingabebilder haben unterschiedliche Formen.")
+    return instance_dice_prepared(pred, *prepare_gt_instances(gt_labels))
+
 if __name__ == "__main__":
+    from skimage.io import imread
     pred = imread("data-git/N2DH-GOWT1/img/t01.tif", as_gray=True) > 0
     gt   = imread("data-git/N2DH-GOWT1/gt/man_seg01.tif", as_gray=True) > 0
     print(f"Dice Score: {dice_score(pred, gt):.4f}")
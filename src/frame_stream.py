@@ -0,0 +1,168 @@
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Union
+
+import numpy as np
+
+from src.load_image_pair import read_image
+
+# Einzelbilder in einem Serienverzeichnis (auch .tiff, anders als im Datenkatalog)
+FRAME_EXTENSIONS = (".tif", ".tiff", ".png")
+
+_DONE = object()
+
+
+def iter_frames(source: Union[str, Path], mmap: bool = True) -> Iterator[np.ndarray]:
+    """
+    Liefert die Einzelbilder einer Zeitserie nacheinander.
+
+    source kann sein:
+        - ein Verzeichnis mit Einzelbildern (t000.tif, t001.tif, ...; sortiert;
+          Endungen siehe FRAME_EXTENSIONS)
+        - ein mehrseitiges TIFF (eine Seite je Zeitpunkt)
+        - eine .npy-Datei der Form (T, H, W)
+
+    Es wird immer nur das aktuelle Bild dekodiert; unkomprimierte Stapel
+    werden speicherabgebildet und scheibenweise gelesen.
+
+    Args:
+        source: Verzeichnis oder Stapeldatei
+        mmap: Speicherabbildung verwenden, wo das Format es erlaubt
+
+    Yields:
+        2-D-Grauwertbild je Zeitpunkt (nativer dtype)
+    """
+    source = str(source)
+
+    if os.path.isdir(source):
+        with os.scandir(source) as it:
+            names = sorted(e.name for e in it if e.is_file() and e.name.lower().endswith(FRAME_EXTENSIONS))
+        if not names:
+            raise FileNotFoundError(f"Keine Einzelbilder ({', '.join(FRAME_EXTENSIONS)}) in {source}")
+        for name in names:
+            yield read_image(os.path.join(source, name), mmap=mmap)
+        return
+
+    if source.lower().endswith(".npy"):
+        stack = np.load(source, mmap_mode="r" if mmap else None)
+        yield from (stack[None] if stack.ndim == 2 else stack)
+        return
+
+    import tifffile
+    if mmap:
+        try:
+            stack = tifffile.memmap(source, mode="r")
+        except ValueError:
+            stack = None  # komprimiert → seitenweise dekodieren
+        if stack is not None:
+            yield from (stack[None] if stack.ndim == 2 else stack)
+            return
+
+    with tifffile.TiffFile(source) as tif:
+        for page in tif.pages:
+            yield page.asarray()
+
+
+def prefetch(frames: Iterable, read_ahead: int = 2) -> Iterator:
+    """
+    Liest die Elemente von frames in einem Hintergrund-Thread voraus.
+
+    Höchstens read_ahead Bilder liegen gleichzeitig im Puffer, sodass der
+    Speicherbedarf unabhängig von der Länge der Serie konstant bleibt, während
+    das nächste Bild schon dekodiert wird. Speicherabgebildete Bilder (np.memmap)
+    werden dabei im Hintergrund-Thread eingelesen, sonst fände das Lesen erst
+    beim Verbraucher statt.
+
+    Args:
+        frames: beliebiger Iterator (z. B. iter_frames)
+        read_ahead: Puffergröße; 0 liest ohne Thread direkt aus frames
+    """
+    if read_ahead <= 0:
+        yield from frames
+        return
+
+    buffer = queue.Queue(maxsize=read_ahead)
+    stop = threading.Event()
+
+    def reader():
+        try:
+            for frame in frames:
+                if stop.is_set():
+                    return
+                if isinstance(frame, np.memmap):
+                    frame = np.array(frame)  # Seiten hier lesen, nicht im Verbraucher
+                buffer.put(frame)
+            buffer.put(_DONE)
+        except BaseException as e:  # an den Verbraucher weiterreichen
+            buffer.put(e)
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # Abbruch durch den Verbraucher: Leser anhalten und Puffer leeren
+        stop.set()
+        while thread.is_alive():
+            try:
+                buffer.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        thread.join()
+
+
+def segment_stream(
+    source: Union[str, Path],
+    func: Callable[..., np.ndarray],
+    out_path: Optional[Union[str, Path]] = None,
+    read_ahead: int = 2,
+    mmap: bool = True,
+    **params
+) -> Iterator[np.ndarray]:
+    """
+    Segmentiert eine Zeitserie Bild für Bild und schreibt die Masken fortlaufend.
+
+    Args:
+        source: Verzeichnis oder Stapeldatei (siehe iter_frames)
+        func: Methode image → Binärmaske (z. B. apply_global_otsu)
+        out_path: optionales Ziel; Endung .tif/.tiff → ein mehrseitiges TIFF
+                  (eine Seite je Zeitpunkt), sonst ein Verzeichnis mit
+                  mask000.tif, mask001.tif, ...
+        read_ahead: Anzahl vorausgelesener Bilder
+        mmap: Eingabe speicherabgebildet lesen, wo möglich
+        params: Parameter für func
+
+    Yields:
+        Binärmaske je Zeitpunkt (uint8); jede Maske ist beim Yield bereits geschrieben
+    """
+    import tifffile
+
+    stack_writer = None
+    if out_path is not None:
+        out_path = str(out_path)
+        if out_path.lower().endswith((".tif", ".tiff")):
+            os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+            stack_writer = tifffile.TiffWriter(out_path, bigtiff=True)
+        else:
+            os.makedirs(out_path, exist_ok=True)
+
+    try:
+        for t, frame in enumerate(prefetch(iter_frames(source, mmap=mmap), read_ahead)):
+            mask = np.asarray(func(frame, **params), dtype=np.uint8)
+            if stack_writer is not None:
+                # unkomprimiert & zusammenhängend → später wieder per mmap lesbar
+                stack_writer.write(mask, contiguous=True)
+            elif out_path is not None:
+                tifffile.imwrite(os.path.join(out_path, f"mask{t:03d}.tif"), mask)
+            yield mask
+    finally:
+        if stack_writer is not None:
+            stack_writer.close()
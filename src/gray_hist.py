@@ -1,8 +1,12 @@
 import numpy as np
-from matplotlib import pyplot as plt
-from PIL import Image
 from pathlib import Path
-from typing import Union, Tuple
+from typing import Callable, Iterable, Optional, Union, Tuple
+
+# Elemente pro bincount-Aufruf; begrenzt den temporären intp-Puffer auf wenige MB
+_CHUNK = 1 << 20
+
+# Höchstens 2**16 Bins pro Grauwert-Histogramm; tiefere Daten werden per Shift gezählt
+NATIVE_MAX_BITS = 16
 
 def compute_gray_histogram(
     image_source: Union[Path, str, np.ndarray],
@@ -10,6 +14,7 @@ def compute_gray_histogram(
     value_range: Tuple[int, int] = (0, 255)
 ) -> Tuple[np.ndarray, np.ndarray]:
     if isinstance(image_source, (Path, str)):
+        from PIL import Image
         img = Image.open(str(image_source)).convert("L")
         arr = np.array(img)
     elif isinstance(image_source, np.ndarray):
@@ -17,10 +22,235 @@ def compute_gray_histogram(
     else:
         raise TypeError("Erwartet Pfad oder NumPy-Array.")
 
+    lo, hi = value_range
+    if (arr.dtype.kind in "ub" and lo == 0
+            and float(hi).is_integer() and bins == int(hi) + 1):
+        # Ganzzahlige Bins (ein Grauwert pro Bin) → direkt zählen,
+        # Werte oberhalb von hi fallen wie bei np.histogram heraus
+        hist = _count_values(arr, bins)
+        bin_edges = np.linspace(lo, hi, bins + 1)
+        return hist, bin_edges
+
     hist, bin_edges = np.histogram(arr.ravel(), bins=bins, range=value_range)
     return hist, bin_edges
 
+def image_histogram(
+    image: np.ndarray, bins: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Histogramm mit dtype-gerechtem Wertebereich für die Schwellwertsuche.
+
+    - uint8 / uint16 / andere vorzeichenlose Ganzzahlen: ein Bin pro Grauwert
+      in voller Bittiefe (256, 4096, 65536 … Bins je nach belegtem Maximum);
+      es entsteht keine float-Kopie. Ab 17 Bit werden die Werte um die
+      überzähligen Bits verschoben, sodass es bei 65536 Bins bleibt
+    - float: 256 Bins über [0, 1], falls die Daten darin liegen, sonst [min, max]
+
+    Args:
+        image: Graustufenbild als np.ndarray
+        bins: optionale Ziel-Binanzahl; feinere Ganzzahlhistogramme werden mit
+              rebin_histogram adaptiv auf den belegten Bereich zusammengefasst
+
+    Returns:
+        hist: absolute Häufigkeiten (int64)
+        bin_edges: Bin-Grenzen in Einheiten des Bildes (len(hist) + 1)
+    """
+    if image.dtype == bool:
+        image = image.view(np.uint8)
+
+    if image.dtype.kind == "u":
+        max_val = int(image.max()) if image.size else 0
+        n_native, shift = _native_bins(max_val)
+        hist = _count_values(image, n_native, shift)
+        bin_edges = np.arange(n_native + 1, dtype=np.float64) * (1 << shift)
+        if bins is not None and bins < n_native:
+            hist, bin_edges = rebin_histogram(hist, bin_edges, bins)
+        return hist, bin_edges
+
+    bins = 256 if bins is None else bins
+    value_range = _value_range(image.dtype, image.min(), image.max())
+    return _chunked_histogram(image, bins, value_range)
+
+def strip_histogram(
+    strips: Callable[[], Iterable[np.ndarray]], dtype: np.dtype, bins: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Wie image_histogram, aber aus Bildstreifen zusammengesetzt (Histogramme
+    sind additiv). So muss nie das ganze Bild im Speicher liegen.
+
+    Args:
+        strips: Funktion, die bei jedem Aufruf die Streifen des Bildes erneut
+                liefert (float / vorzeichenbehaftet: zwei Durchläufe für den Bereich)
+        dtype: dtype des Bildes
+        bins: wie bei image_histogram
+
+    Returns:
+        hist, bin_edges identisch zu image_histogram auf dem ganzen Bild
+    """
+    dtype = np.dtype(dtype)
+    if dtype == bool:
+        dtype = np.dtype(np.uint8)
+
+    if dtype.kind == "u":
+        hist = np.zeros(256, dtype=np.int64)
+        shift = 0
+        for strip in strips():
+            if strip.size == 0:
+                continue
+            strip = strip.view(np.uint8) if strip.dtype == bool else strip
+            n, s = _native_bins(int(strip.max()))
+            if s:
+                # Mehr als 16 Bit → Shift hängt vom Maximum aller Streifen ab,
+                # daher Maximum bestimmen und mit diesem Shift neu zählen
+                max_val = max(int(x.max()) for x in strips() if x.size)
+                n, shift = _native_bins(max_val)
+                hist = np.zeros(n, dtype=np.int64)
+                for x in strips():
+                    if x.size:
+                        hist += _count_values(x, n, shift)
+                break
+            if n > len(hist):
+                hist = np.concatenate([hist, np.zeros(n - len(hist), dtype=np.int64)])
+            hist[:n] += _count_values(strip, n)
+        bin_edges = np.arange(len(hist) + 1, dtype=np.float64) * (1 << shift)
+        if bins is not None and bins < len(hist):
+            hist, bin_edges = rebin_histogram(hist, bin_edges, bins)
+        return hist, bin_edges
+
+    bins = 256 if bins is None else bins
+    extrema = [(s.min(), s.max()) for s in strips() if s.size]
+    value_range = _value_range(dtype, min(e[0] for e in extrema), max(e[1] for e in extrema))
+    hist = np.zeros(bins, dtype=np.int64)
+    for strip in strips():
+        hist += _chunked_histogram(strip, bins, value_range)[0]
+    return hist, np.linspace(value_range[0], value_range[1], bins + 1)
+
+def _native_bins(max_val: int) -> Tuple[int, int]:
+    """
+    Binanzahl und Shift für ein Grauwert-Histogramm bis max_val
+    (ein Bin pro Wert bis NATIVE_MAX_BITS, darüber 2**shift Werte pro Bin).
+    """
+    bits = max(8, max_val.bit_length())
+    shift = max(0, bits - NATIVE_MAX_BITS)
+    return 1 << (bits - shift), shift
+
+def _value_range(dtype: np.dtype, lo, hi) -> Tuple[float, float]:
+    """
+    Histogrammbereich für float- und vorzeichenbehaftete Ganzzahlbilder.
+    """
+    if np.dtype(dtype).kind == "f":
+        lo, hi = float(lo), float(hi)
+        return (0.0, 1.0) if lo >= 0.0 and hi <= 1.0 else (lo, hi)
+    # Vorzeichenbehaftete Ganzzahlen: Bereich [min, max]
+    return int(lo), int(hi) + 1
+
+def rebin_histogram(
+    hist: np.ndarray, bin_edges: np.ndarray, bins: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fasst ein Histogramm mit gleich breiten Bins adaptiv auf `bins` Bins zusammen.
+
+    Nur der belegte Bereich (erstes bis letztes nicht-leeres Bin) wird in gleich
+    breite Gruppen aufgeteilt, sodass z. B. 12-Bit-Daten in einem 16-Bit-Container
+    nicht in wenigen Bins landen.
+    """
+    occupied = np.flatnonzero(hist)
+    if occupied.size == 0:
+        return hist[:bins], bin_edges[: bins + 1]
+
+    lo, hi = occupied[0], occupied[-1] + 1
+    width = -(-(hi - lo) // bins)
+    seg = np.zeros(width * bins, dtype=hist.dtype)
+    part = hist[lo : lo + width * bins]
+    seg[: part.size] = part
+    new_hist = seg.reshape(bins, width).sum(axis=1)
+
+    step = bin_edges[1] - bin_edges[0]
+    new_edges = bin_edges[lo] + np.arange(bins + 1) * width * step
+    return new_hist, new_edges
+
+def sparse_histogram(hist: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Dünnbesetzte Darstellung eines Histogramms: nur belegte Bins.
+
+    Returns:
+        values: Bin-Indizes der belegten Bins (aufsteigend)
+        counts: zugehörige Häufigkeiten
+    """
+    values = np.flatnonzero(hist)
+    return values, hist[values]
+
+def quantize_levels(image: np.ndarray, bins: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bildet ein Bild adaptiv auf ganzzahlige Stufen 0 … bins-1 über [min, max] ab.
+
+    Anders als img_as_ubyte geht dabei kein belegter Dynamikbereich verloren
+    (z. B. bei 12-Bit-Daten in uint16-Dateien).
+
+    Returns:
+        levels: Stufenbild (uint8 bzw. uint16)
+        bin_edges: Grenzen der Stufen in Einheiten des Bildes (bins + 1)
+    """
+    level_dtype = np.uint8 if bins <= 256 else np.uint16
+    lo, hi = image.min(), image.max()
+
+    if image.dtype.kind in "ui":
+        lo, hi = int(lo), int(hi)
+        width = -(-(hi - lo + 1) // bins)
+        # in int64 rechnen, sonst läuft image - lo bei vorzeichenbehafteten Typen über
+        levels = ((image.astype(np.int64) - lo) // width).astype(level_dtype)
+        bin_edges = lo + np.arange(bins + 1, dtype=np.float64) * width
+        return levels, bin_edges
+
+    lo, hi = float(lo), float(hi)
+    span = (hi - lo) or 1.0
+    levels = np.clip((image - lo) * (bins / span), 0, bins - 1).astype(level_dtype)
+    bin_edges = np.linspace(lo, lo + span, bins + 1)
+    return levels, bin_edges
+
+def bin_to_threshold(t, bin_edges: np.ndarray, dtype: np.dtype):
+    """
+    Übersetzt einen Bin-Index (oder ein Array davon) in einen Schwellwert im
+    Wertebereich des Bildes, sodass `image > threshold` genau die Pixel in
+    Bins > t auswählt.
+    """
+    upper = bin_edges[np.asarray(t) + 1]
+    if np.dtype(dtype).kind in "uib":
+        return np.ceil(upper) - 1
+    return np.nextafter(upper, -np.inf)
+
+def _count_values(arr: np.ndarray, length: int, shift: int = 0) -> np.ndarray:
+    """
+    Zählt vorzeichenlose Ganzzahlen (optional >> shift) blockweise mit np.bincount.
+    Werte >= length werden verworfen.
+    """
+    hist = np.zeros(length, dtype=np.int64)
+    flat = arr.reshape(-1)
+    for k in range(0, flat.size, _CHUNK):
+        chunk = flat[k : k + _CHUNK]
+        if shift:
+            chunk = chunk >> shift
+        if chunk.dtype == np.uint64:
+            chunk = chunk.astype(np.int64)  # bincount akzeptiert kein uint64
+        hist += np.bincount(chunk, minlength=length)[:length]
+    return hist
+
+def _chunked_histogram(
+    arr: np.ndarray, bins: int, value_range: Tuple[float, float]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    np.histogram blockweise, damit keine flache Kopie des ganzen Bildes entsteht.
+    """
+    hist = np.zeros(bins, dtype=np.int64)
+    flat = arr.reshape(-1)
+    for k in range(0, flat.size, _CHUNK):
+        h, _ = np.histogram(flat[k : k + _CHUNK], bins=bins, range=value_range)
+        hist += h
+    bin_edges = np.linspace(value_range[0], value_range[1], bins + 1)
+    return hist, bin_edges
+
 def plot_gray_histogram(hist: np.ndarray, bin_edges: np.ndarray):
+    from matplotlib import pyplot as plt
     plt.figure(figsize=(8, 4))
     plt.bar(bin_edges[:-1], hist, width=bin_edges[1] - bin_edges[0], align='edge')
     plt.xlabel("Grauwert")
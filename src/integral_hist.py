@@ -0,0 +1,71 @@
+import numpy as np
+from skimage import img_as_ubyte
+from src.otsu_global import otsu_threshold
+
+def build_integral_histogram(image: np.ndarray, bins: int = 256) -> np.ndarray:
+    """
+    Baut ein Integral-Histogramm (H+1, W+1, bins) für ein Graustufenbild.
+
+    Eintrag [y, x, b] zählt die Pixel im Rechteck [0, y) × [0, x), deren Grauwert
+    in Bin b fällt. Mit bins < 256 werden je 256 / bins Grauwerte zusammengefasst,
+    was den Speicherbedarf entsprechend senkt.
+
+    Args:
+        image: Graustufenbild (wird nach uint8 konvertiert)
+        bins: Anzahl der Bins (1 … 256)
+
+    Returns:
+        Kumulatives Histogramm (dtype=uint32 bzw. uint64 bei sehr großen Bildern)
+    """
+    if not 1 <= bins <= 256:
+        raise ValueError("bins muss zwischen 1 und 256 liegen.")
+
+    img_u8 = img_as_ubyte(image)
+    H, W = img_u8.shape
+    idx = (img_u8.astype(np.uint16) * bins) >> 8
+
+    dtype = np.uint32 if H * W < 2**32 else np.uint64
+    ih = np.zeros((H + 1, W + 1, bins), dtype=dtype)
+    cols = np.arange(W)
+    row_onehot = np.zeros((W, bins), dtype=dtype)
+
+    for y in range(H):
+        # Zeile als One-Hot-Matrix, entlang x kumuliert, auf die Vorzeile addiert
+        row_onehot[:] = 0
+        row_onehot[cols, idx[y]] = 1
+        np.cumsum(row_onehot, axis=0, out=ih[y + 1, 1:])
+        ih[y + 1, 1:] += ih[y, 1:]
+
+    return ih
+
+def region_histogram(ih: np.ndarray, y0, x0, y1, x1) -> np.ndarray:
+    """
+    Histogramm des Rechtecks [y0, y1) × [x0, x1) in O(bins).
+
+    Die Koordinaten dürfen auch Arrays gleicher Länge N sein; dann wird ein
+    Array (N, bins) zurückgegeben, das direkt an otsu_threshold_batch passt.
+    """
+    a = ih[y1, x1].astype(np.int64)
+    a -= ih[y0, x1]
+    a -= ih[y1, x0]
+    a += ih[y0, x0]
+    return a
+
+def bin_to_gray(t, bins: int):
+    """
+    Rechnet einen Bin-Index in den größten uint8-Grauwert dieses Bins um,
+    sodass `img_u8 > bin_to_gray(t, bins)` der Klassentrennung entspricht.
+    """
+    return -(-(np.asarray(t) + 1) * 256 // bins) - 1
+
+def region_otsu_threshold(ih: np.ndarray, y0: int, x0: int, y1: int, x1: int) -> int:
+    """
+    Otsu-Schwellwert (uint8-Grauwert) für das Rechteck [y0, y1) × [x0, x1).
+    """
+    hist = region_histogram(ih, y0, x0, y1, x1)
+    total = hist.sum()
+    if total == 0:
+        raise ValueError("Leeres Rechteck.")
+
+    t = otsu_threshold(hist / total)
+    return int(bin_to_gray(t, ih.shape[-1]))
@@ -1,26 +1,76 @@
 import numpy as np
-from skimage.io import imread
 from typing import Tuple, Union
 from pathlib import Path
 
+# Endungen, die ohne Dekodieren direkt auf die Datei abgebildet werden können
+MMAP_EXTENSIONS = (".tif", ".tiff", ".npy")
+
+
+def read_image(path: Union[str, Path], mmap: bool = False) -> np.ndarray:
+    """
+    Liest ein Bild im nativen dtype, optional speicherabgebildet (zero-copy).
+
+    Mit mmap=True werden unkomprimierte TIFFs (tifffile.memmap) und .npy-Dateien
+    (np.load mit mmap_mode="r") nur abgebildet statt dekodiert; Pixel werden erst
+    beim Zugriff gelesen. Komprimierte TIFFs (z. B. LZW) und andere Formate
+    werden normal gelesen. Farbbilder werden in Graustufen (float) umgewandelt.
+
+    Args:
+        path: Pfad zur Bilddatei
+        mmap: Speicherabbildung verwenden, wo das Dateiformat es erlaubt
+
+    Returns:
+        Bild als np.ndarray bzw. schreibgeschütztes np.memmap
+    """
+    path = str(path)
+    ext = Path(path).suffix.lower()
+
+    if mmap and ext in MMAP_EXTENSIONS:
+        if ext == ".npy":
+            image = np.load(path, mmap_mode="r")
+        else:
+            import tifffile
+            try:
+                image = tifffile.memmap(path, mode="r")
+            except ValueError:
+                # komprimiert oder nicht zusammenhängend gespeichert
+                image = tifffile.imread(path)
+        if image.ndim == 3 and image.shape[-1] in (3, 4):
+            from skimage.color import rgb2gray, rgba2rgb
+            image = rgb2gray(rgba2rgb(image) if image.shape[-1] == 4 else image)
+        return image
+
+    from skimage.io import imread
+    return imread(path, as_gray=True)
+
+
 def load_image_and_gt(
     image_path: Union[str, Path],
     gt_path: Union[str, Path],
-    threshold: float = 0.0
-) -> Tuple[np.ndarray, np.ndarray]:
+    threshold: float = 0.0,
+    return_labels: bool = False,
+    mmap: bool = False
+) -> Tuple[np.ndarray, ...]:
     """
     Lädt ein Graustufenbild und die zugehörige Ground-Truth-Maske als bool-Arrays.
 
     Args:
         image_path: Pfad zum Eingabebild (Graustufenbild)
         gt_path: Pfad zur Ground Truth (Segmentierungsmaske)
-        threshold: Schwellenwert für Binarisierung (z. B. 0.0 für alles > 0)
+        threshold: Schwellenwert für Binarisierung (z. B. 0.0 für alles > 0)
+        mmap: Bild und GT-Labels speicherabgebildet laden (siehe read_image);
+              float-Umwandlung passiert dann erst in den Methoden, die sie brauchen
 
     Returns:
-        image: Grauwertbild als np.ndarray (float, [0, 1])
+        image: Grauwertbild als np.ndarray im nativen dtype (z. B. uint8/uint16;
+               float in [0, 1] nur bei Farbbildern)
         gt_mask: binäre Ground-Truth-Maske (dtype=bool)
+        gt_labels: GT-Labelbild im nativen dtype (nur bei return_labels=True)
     """
-    image = imread(str(image_path), as_gray=True)
-    gt_mask = imread(str(gt_path), as_gray=True) > threshold
+    image = read_image(image_path, mmap=mmap)
+    gt_labels = read_image(gt_path, mmap=mmap)
+    gt_mask = gt_labels > threshold
 
+    if return_labels:
+        return image, gt_mask, gt_labels
     return image, gt_mask
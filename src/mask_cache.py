@@ -0,0 +1,217 @@
+import hashlib
+import inspect
+import json
+import os
+import sys
+import threading
+import numpy as np
+from typing import Callable, Dict, Optional, Union
+from src.packed_mask import PackedMask
+
+# Nach so viel selbst geschriebenen Bytes (Anteil von max_bytes) wird die
+# Verzeichnisgröße neu bestimmt, damit auch Schreibvorgänge anderer Prozesse zählen
+RESCAN_FRACTION = 1 / 16
+
+
+class MaskCache:
+    """
+    Inhaltsadressierter Festplatten-Cache für Segmentierungsmasken.
+
+    Schlüssel ist der Hash aus Bildinhalt, Methodenname, Methodenparametern und
+    Code-Version der Methode (Quelltext der beteiligten Module). Masken werden
+    bit-gepackt als komprimiertes .npz abgelegt; überschreitet der Cache
+    max_bytes, werden die am längsten nicht benutzten Einträge gelöscht (LRU).
+
+    Mehrere Prozesse (Worker-Pool) können denselben Cache nutzen; jeder
+    bestimmt die Verzeichnisgröße neu, sobald er RESCAN_FRACTION · max_bytes
+    geschrieben hat, sodass der Cache höchstens um Worker · RESCAN_FRACTION ·
+    max_bytes über die Grenze wächst.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 2 * 1024**3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._versions: Dict[Callable, str] = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size: Optional[int] = None  # erst beim ersten put() bestimmt
+        self._written = 0  # seit dem letzten Scan selbst geschriebene Bytes
+
+    @staticmethod
+    def image_hash(image: np.ndarray) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{image.dtype.str}{image.shape}".encode())
+        h.update(np.ascontiguousarray(image).data)
+        return h.hexdigest()
+
+    def key(self, image_hash: str, method: str, func: Callable, params: dict) -> str:
+        payload = json.dumps(
+            [image_hash, method, params, self._code_version(func)],
+            sort_keys=True, default=str
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str, packed: bool = False) -> Optional[Union[np.ndarray, PackedMask]]:
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                shape = tuple(data["shape"])
+                bits = data["bits"]
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            return None
+
+        try:
+            os.utime(path)  # Zugriffszeitpunkt für LRU
+        except FileNotFoundError:
+            pass  # inzwischen von einem anderen Prozess verdrängt
+        if packed:
+            return PackedMask(bits, shape)
+        return np.unpackbits(bits, count=int(np.prod(shape))).reshape(shape)
+
+    def put(self, key: str, mask: Union[np.ndarray, PackedMask]) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        packed = PackedMask.from_array(mask)
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, bits=packed.bits, shape=np.array(packed.shape))
+
+        with self._lock:
+            if self._size is None or self._written >= RESCAN_FRACTION * self.max_bytes:
+                self._size = self._scan_size()
+                self._written = 0
+            try:
+                old_size = os.path.getsize(path)  # überschriebener Eintrag
+            except FileNotFoundError:
+                old_size = 0
+            os.replace(tmp_path, path)  # atomar, auch bei parallelen Prozessen
+            delta = os.path.getsize(path) - old_size
+            self._size += delta
+            self._written += max(delta, 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def get_or_compute(
+        self, image: np.ndarray, method: str, func: Callable, params: dict,
+        image_hash: Optional[str] = None, packed: bool = False
+    ) -> Union[np.ndarray, PackedMask]:
+        key = self.key(image_hash or self.image_hash(image), method, func, params)
+        mask = self.get(key, packed=packed)
+        if mask is None:
+            mask = func(image, **params)
+            if packed:
+                mask = PackedMask.from_array(mask)
+            self.put(key, mask)
+        return mask
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def _entries(self) -> list:
+        """
+        (Pfad, mtime, Größe) aller Einträge; von anderen Prozessen gerade
+        gelöschte Dateien werden übersprungen.
+        """
+        entries = []
+        for e in os.scandir(self.cache_dir):
+            if not e.name.endswith(".npz"):
+                continue
+            try:
+                st = e.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((e.path, st.st_mtime, st.st_size))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, _, size in self._entries())
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        self._size = sum(size for _, _, size in entries)
+        self._written = 0
+        for path, _, size in entries:
+            if self._size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # bereits von einem anderen Prozess entfernt
+            self._size -= size
+
+    def _code_version(self, func: Callable) -> str:
+        if func not in self._versions:
+            self._versions[func] = code_version(func)
+        return self._versions[func]
+
+
+# Einfache Modulkonstanten (GROSS geschrieben, z. B. SPARSE_MIN_BINS) gehen mit
+# ihrem Wert in die Code-Version ein; Zustandsvariablen wie tracing._enabled nicht
+_CONSTANT_TYPES = (bool, int, float, str, bytes, type(None))
+
+
+def code_version(func: Callable) -> str:
+    """
+    Hash über den Quelltext der Methode und aller Funktionen, Klassen und
+    Konstanten aus Projektmodulen (src.* bzw. das Modul der Methode), die sie
+    (transitiv) verwendet. Andere Methoden im selben Modul oder neu
+    registrierte Methoden ändern ihn nicht.
+    """
+    home = getattr(func, "__module__", None)
+
+    def is_project(obj) -> bool:
+        name = obj.__name__ if inspect.ismodule(obj) else getattr(obj, "__module__", None)
+        return isinstance(name, str) and (name.startswith("src.") or name == home)
+
+    h = hashlib.blake2b(digest_size=16)
+    pending = [func]
+    seen = set()
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        try:
+            h.update(inspect.getsource(obj).encode())
+        except (OSError, TypeError):
+            h.update(getattr(obj, "__qualname__", repr(obj)).encode())
+
+        for fn in _functions(obj):
+            names = _referenced_names(fn.__code__)
+            for name in names:
+                value = fn.__globals__.get(name)
+                if inspect.ismodule(value):
+                    # z. B. tracing.span → nur die benutzten Attribute des Moduls
+                    if is_project(value):
+                        pending.extend(getattr(value, n) for n in names
+                                       if callable(getattr(value, n, None)) and is_project(getattr(value, n)))
+                elif inspect.isfunction(value) or inspect.isclass(value):
+                    if is_project(value):
+                        pending.append(value)
+                elif isinstance(value, _CONSTANT_TYPES) and name.lstrip("_").isupper():
+                    h.update(f"{name}={value!r}".encode())
+    return h.hexdigest()
+
+
+def _functions(obj) -> list:
+    """
+    Funktionen eines Objekts: die Funktion selbst bzw. die Methoden einer Klasse.
+    """
+    if inspect.isfunction(obj):
+        return [obj]
+    if inspect.isclass(obj):
+        members = [getattr(v, "__func__", v) for v in vars(obj).values()]
+        members += [v.fget for v in vars(obj).values() if isinstance(v, property) and v.fget]
+        return [m for m in members if inspect.isfunction(m)]
+    return []
+
+
+def _referenced_names(code) -> list:
+    """
+    Globale Namen und Attributnamen eines Code-Objekts inkl. verschachtelter
+    Funktionen, Lambdas und Comprehensions (in stabiler Reihenfolge).
+    """
+    names = list(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names += [n for n in _referenced_names(const) if n not in names]
+    return names
@@ -1,5 +1,21 @@
 import numpy as np
-from src.gray_hist import compute_gray_histogram
+from pathlib import Path
+from typing import Optional, Union
+from src.gray_hist import image_histogram, strip_histogram, sparse_histogram, bin_to_threshold
+from src.packed_mask import PackedMask
+from src import tracing
+
+# Ab dieser Binanzahl wird Otsu nur über die belegten Bins gerechnet
+SPARSE_MIN_BINS = 4096
+
+# Pixel pro Streifen im Out-of-Core-Modus (apply_global_otsu_chunked)
+STRIP_PIXELS = 1 << 22
+
+# Multi-Otsu: Lookup-Tabellen wachsen mit bins²; feinere Histogramme werden
+# auf höchstens MULTI_OTSU_MAX_BINS Bins zusammengefasst, und pro Stapel
+# werden nur so viele Histogramme gerechnet, wie in MULTI_OTSU_MAX_BYTES passen
+MULTI_OTSU_MAX_BINS = 1024
+MULTI_OTSU_MAX_BYTES = 256 * 1024**2
 
 def otsu_threshold(p: np.ndarray) -> int:
     P = np.cumsum(p)
@@ -9,11 +25,210 @@ def otsu_threshold(p: np.ndarray) -> int:
     sigma_b2 = (mu_T * P - mu)**2 / (P * (1 - P) + 1e-12)
     return int(np.argmax(sigma_b2))
 
-def binarize(arr: np.ndarray, t: int) -> np.ndarray:
+def otsu_threshold_sparse(values: np.ndarray, counts: np.ndarray) -> int:
+    """
+    Otsu auf einem dünnbesetzten Histogramm (nur belegte Bins).
+
+    Zwischen zwei belegten Bins ist die Zwischenklassenvarianz konstant, daher
+    genügt die Auswertung an den belegten Bins; das Ergebnis entspricht
+    otsu_threshold auf dem dichten Histogramm. Bei 65536 Bins mit wenigen
+    tausend belegten Werten schrumpfen cumsum und argmax entsprechend.
+
+    Returns:
+        Bin-Index des Schwellwerts
+    """
+    p = counts / counts.sum()
+    P = np.cumsum(p)
+    mu = np.cumsum(values * p)
+    mu_T = mu[-1]
+    sigma_b2 = (mu_T * P - mu)**2 / (P * (1 - P) + 1e-12)
+    return int(values[np.argmax(sigma_b2)])
+
+def otsu_threshold_batch(hists: np.ndarray) -> np.ndarray:
+    """
+    Otsu-Schwellwerte für viele Histogramme in einem NumPy-Durchlauf.
+
+    Args:
+        hists: Array (N, bins) mit absoluten Häufigkeiten oder Wahrscheinlichkeiten
+
+    Returns:
+        Array (N,) mit Bin-Indizes, identisch zu otsu_threshold je Zeile
+    """
+    hists = np.asarray(hists)
+    p = hists / hists.sum(axis=1, keepdims=True)
+    P = np.cumsum(p, axis=1)
+    bins = np.arange(p.shape[1])
+    mu = np.cumsum(bins * p, axis=1)
+    mu_T = mu[:, -1:]
+    sigma_b2 = (mu_T * P - mu)**2 / (P * (1 - P) + 1e-12)
+    return np.argmax(sigma_b2, axis=1)
+
+def multi_otsu_threshold(p: np.ndarray, classes: int = 3) -> np.ndarray:
+    """
+    Multi-Otsu-Schwellwerte per dynamischer Programmierung.
+
+    Mit den kumulierten Momenten P und mu (Lookup-Tabellen) ist der Beitrag
+    einer Klasse [i, j) zur Zwischenklassenvarianz (mu[j] - mu[i])² / (P[j] - P[i])
+    in O(1) abrufbar. Die optimale Zerlegung in `classes` Klassen wird Klasse für
+    Klasse aufgebaut (O(classes · bins²)) statt alle Kombinationen aufzuzählen.
+
+    Histogramme mit mehr als MULTI_OTSU_MAX_BINS Bins (z. B. 4096 / 65536 aus
+    image_histogram) werden vorher in gleich breite Gruppen zusammengefasst;
+    die Schwellen liegen dann auf Gruppengrenzen, werden aber als Bin-Indizes
+    des ursprünglichen Histogramms zurückgegeben.
+
+    Args:
+        p: Histogramm (bins,) oder Stapel von Histogrammen (N, bins);
+           absolute Häufigkeiten oder Wahrscheinlichkeiten
+        classes: Anzahl der Klassen (>= 2)
+
+    Returns:
+        Bin-Indizes der Schwellen, Form (classes - 1,) bzw. (N, classes - 1).
+        Pixel mit Wert > t[k] gehören zu einer Klasse oberhalb von k.
+    """
+    p = np.asarray(p, dtype=np.float64)
+    single = p.ndim == 1
+    p = np.atleast_2d(p)
+    if classes < 2 or classes > p.shape[1]:
+        raise ValueError("classes muss zwischen 2 und der Anzahl der Bins liegen.")
+
+    N, L = p.shape
+    width = -(-L // MULTI_OTSU_MAX_BINS)
+    if width > 1:
+        padded = np.zeros((N, width * -(-L // width)))
+        padded[:, :L] = p
+        p = padded.reshape(N, -1, width).sum(axis=2)
+        if classes > p.shape[1]:
+            raise ValueError("classes muss zwischen 2 und der Anzahl der Bins liegen.")
+
+    # Lookup-Tabellen: ca. 3 float64-Tabellen (bins+1)² je Histogramm
+    table_bytes = 3 * 8 * (p.shape[1] + 1)**2
+    chunk = max(1, MULTI_OTSU_MAX_BYTES // table_bytes)
+    thresholds = np.concatenate([
+        _multi_otsu_dp(p[k : k + chunk], classes)
+        for k in range(0, p.shape[0], chunk)
+    ])
+    if width > 1:
+        # Gruppe t → letztes ursprüngliches Bin der Gruppe
+        thresholds = np.minimum((thresholds + 1) * width - 1, L - 1)
+    return thresholds[0] if single else thresholds
+
+def _multi_otsu_dp(p: np.ndarray, classes: int) -> np.ndarray:
+    N, L = p.shape
+    p = p / p.sum(axis=1, keepdims=True)
+    P = np.zeros((N, L + 1))
+    mu = np.zeros((N, L + 1))
+    np.cumsum(p, axis=1, out=P[:, 1:])
+    np.cumsum(np.arange(L) * p, axis=1, out=mu[:, 1:])
+
+    # Lookup-Tabelle: Beitrag der Klasse [i, j) für alle i < j
+    # (in-place, damit nur zwei Tabellen gleichzeitig im Speicher liegen)
+    dP = P[:, None, :] - P[:, :, None]
+    contrib = mu[:, None, :] - mu[:, :, None]
+    np.square(contrib, out=contrib)
+    empty = dP <= 1e-12
+    np.divide(contrib, dP, out=contrib, where=~empty)
+    contrib[empty] = 0.0
+    del dP, empty
+    valid = np.triu(np.ones((L + 1, L + 1), dtype=bool), k=1)
+    contrib[:, ~valid] = -np.inf
+    del valid
+
+    # best[:, j]: optimaler Wert für die ersten k Klassen über die Bins [0, j)
+    best = contrib[:, 0, :]
+    back = []
+    for _ in range(classes - 1):
+        cand = best[:, :, None] + contrib
+        back.append(np.argmax(cand, axis=1))
+        best = np.take_along_axis(cand, back[-1][:, None, :], axis=1)[:, 0, :]
+        del cand
+
+    # Rückverfolgung der Klassengrenzen ab dem letzten Bin
+    bounds = np.empty((N, classes - 1), dtype=np.intp)
+    b = np.full(N, L, dtype=np.intp)
+    rows = np.arange(N)
+    for k in range(classes - 2, -1, -1):
+        b = back[k][rows, b]
+        bounds[:, k] = b
+
+    return bounds - 1
+
+def binarize(arr: np.ndarray, t: int, packed: bool = False) -> Union[np.ndarray, PackedMask]:
+    """
+    Binärmaske arr > t als uint8 (0/1) bzw. bit-gepackt (packed=True).
+    """
+    if packed:
+        return PackedMask.from_array(arr > t)
     return (arr > t).astype(np.uint8)
 
-def apply_global_otsu(image: np.ndarray) -> np.ndarray:
-    hist, _ = compute_gray_histogram(image)
-    p = hist / hist.sum()
-    t = otsu_threshold(p)
-    return binarize(image, t)
+def apply_global_otsu(
+    image: np.ndarray, bins: Optional[int] = None, packed: bool = False
+) -> Union[np.ndarray, PackedMask]:
+    """
+    Globales Otsu in voller Bittiefe (optional auf `bins` Bins zusammengefasst).
+    Mit packed=True wird die Maske bit-gepackt zurückgegeben.
+    """
+    with tracing.span("histogram"):
+        hist, bin_edges = image_histogram(image, bins)
+    t = _histogram_otsu(hist)
+    return binarize(image, bin_to_threshold(t, bin_edges, image.dtype), packed=packed)
+
+def apply_global_otsu_chunked(
+    image: np.ndarray,
+    out: Optional[Union[str, Path, np.ndarray]] = None,
+    bins: Optional[int] = None,
+    strip_rows: Optional[int] = None
+) -> np.ndarray:
+    """
+    Globales Otsu für Bilder, die größer als der Arbeitsspeicher sind.
+
+    Das Bild (typischerweise ein np.memmap aus read_image(..., mmap=True))
+    wird in Zeilenstreifen gelesen: erst wird das Histogramm aus den Streifen
+    aufsummiert, dann die Schwelle einmal bestimmt und die Maske Streifen für
+    Streifen in `out` geschrieben. Der Spitzenspeicher liegt bei wenigen
+    Streifen statt beim ganzen Bild; die Maske entspricht apply_global_otsu.
+
+    Args:
+        image: 2-D-Bild (ndarray oder np.memmap)
+        out: Ziel der Maske: None (neues Array im Speicher), ein Pfad
+             (.npy → np.lib.format.open_memmap, sonst unkomprimiertes TIFF
+             per tifffile.memmap) oder ein vorhandenes uint8-Array / memmap
+        bins: wie bei apply_global_otsu
+        strip_rows: Zeilen pro Streifen (Standard: ca. STRIP_PIXELS Pixel)
+
+    Returns:
+        Binärmaske (uint8) bzw. das memmap in `out`
+    """
+    H = image.shape[0]
+    row_pixels = max(1, int(np.prod(image.shape[1:])))
+    rows = strip_rows or max(1, STRIP_PIXELS // row_pixels)
+
+    def strips():
+        for y in range(0, H, rows):
+            yield image[y : y + rows]
+
+    hist, bin_edges = strip_histogram(strips, image.dtype, bins)
+    threshold = bin_to_threshold(_histogram_otsu(hist), bin_edges, image.dtype)
+
+    if out is None:
+        out = np.empty(image.shape, dtype=np.uint8)
+    elif isinstance(out, (str, Path)):
+        out = _open_mask_memmap(str(out), image.shape)
+
+    for y, strip in zip(range(0, H, rows), strips()):
+        np.greater(strip, threshold, out=out[y : y + rows])
+
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
+
+def _histogram_otsu(hist: np.ndarray) -> int:
+    if len(hist) >= SPARSE_MIN_BINS:
+        return otsu_threshold_sparse(*sparse_histogram(hist))
+    return otsu_threshold(hist / hist.sum())
+
+def _open_mask_memmap(path: str, shape: tuple) -> np.memmap:
+    if path.lower().endswith(".npy"):
+        return np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=shape)
+    import tifffile
+    return tifffile.memmap(path, shape=shape, dtype=np.uint8)
@@ -1,25 +1,121 @@
 import numpy as np
+from typing import Optional
 from skimage import img_as_ubyte
-from src.gray_hist import compute_gray_histogram
-from src.otsu_global import otsu_threshold
+from src.gray_hist import quantize_levels, bin_to_threshold
+from src.otsu_global import otsu_threshold_batch
 
-def local_otsu(image: np.ndarray, radius: int = 3) -> tuple[np.ndarray, np.ndarray]:
-    img_u8 = img_as_ubyte(image)
-    H, W = img_u8.shape
-    t_map = np.zeros((H, W), dtype=np.uint8)
+def local_otsu(
+    image: np.ndarray, radius: int = 3, bins: Optional[int] = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Lokales Otsu mit gleitendem Histogramm (Huang / Perreault–Hébert).
+
+    Für jede Spalte des gepaddeten Bildes wird ein Histogramm über die aktuellen
+    2r+1 Zeilen geführt. Beim Wechsel in die nächste Zeile wird pro Spalte nur
+    ein Pixel entfernt und eines hinzugefügt; entlang der Zeile entstehen die
+    Fensterhistogramme als Differenzen der kumulierten Spaltenhistogramme.
+    Die Schwellwerte einer ganzen Zeile werden mit otsu_threshold_batch
+    bestimmt. Das Ergebnis ist identisch zur blockweisen Berechnung.
+
+    Args:
+        image: Graustufenbild
+        radius: Fensterradius r (Fenster (2r+1)²)
+        bins: None → Umrechnung nach uint8 (img_as_ubyte), t_map in uint8-Grauwerten;
+              sonst adaptive Quantisierung des belegten Wertebereichs auf `bins`
+              Stufen (z. B. 4096 für 12-Bit-Daten), t_map in Einheiten des Bildes
+    """
+    if bins is None:
+        levels = img_as_ubyte(image)
+        n_bins = 256
+    else:
+        levels, bin_edges = quantize_levels(image, bins)
+        n_bins = bins
+
+    H, W = levels.shape
+    t_idx = np.zeros((H, W), dtype=levels.dtype)
     mask  = np.zeros((H, W), dtype=bool)
 
     pad = radius
-    padded = np.pad(img_u8, pad, mode="reflect")
+    padded = np.pad(levels, pad, mode="reflect")
     w = 2 * radius + 1
 
+    # Spaltenhistogramme über die ersten w Zeilen
+    cols = np.arange(padded.shape[1])
+    col_hist = np.zeros((padded.shape[1], n_bins), dtype=np.int64)
+    for k in range(w):
+        col_hist[cols, padded[k]] += 1
+
+    col_cum = np.zeros((padded.shape[1] + 1, n_bins), dtype=np.int64)
     for i in range(H):
-        for j in range(W):
-            block = padded[i : i + w, j : j + w]
-            hist, _ = compute_gray_histogram(block)
-            p = hist / hist.sum()
-            t = otsu_threshold(p)
-            t_map[i, j] = t
-            mask[i, j] = (img_u8[i, j] > t)
+        if i > 0:
+            # Fenster um eine Zeile nach unten schieben
+            col_hist[cols, padded[i - 1]] -= 1
+            col_hist[cols, padded[i + w - 1]] += 1
+
+        # Fensterhistogramm j = Summe der Spalten j .. j+w-1
+        np.cumsum(col_hist, axis=0, out=col_cum[1:])
+        hists = col_cum[w:] - col_cum[:-w]
+
+        t_row = otsu_threshold_batch(hists)
+        t_idx[i] = t_row
+        mask[i] = levels[i] > t_row
+
+    if bins is None:
+        return t_idx, mask
 
+    t_map = bin_to_threshold(t_idx, bin_edges, image.dtype)
+    return t_map.astype(image.dtype), mask
+
+def tiled_otsu(image: np.ndarray, tile_size: int = 128) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Kachelbasiertes lokales Otsu (ähnlich CLAHE).
+
+    Das Bild wird in Kacheln der Kantenlänge tile_size zerlegt, pro Kachel wird
+    ein Otsu-Schwellwert bestimmt und die Schwellwertkarte anschließend zwischen
+    den Kachelmittelpunkten bilinear auf volle Auflösung interpoliert. Der
+    Aufwand wächst mit der Anzahl der Kacheln statt mit der Anzahl der Pixel.
+
+    Returns:
+        t_map: interpolierte Schwellwertkarte (float32, uint8-Grauwerte)
+        mask: binäre Maske (dtype=bool)
+    """
+    img_u8 = img_as_ubyte(image)
+    H, W = img_u8.shape
+    ny = -(-H // tile_size)
+    nx = -(-W // tile_size)
+
+    # Alle Kachelhistogramme mit einem einzigen bincount
+    tile_row = np.arange(H) // tile_size
+    tile_col = np.arange(W) // tile_size
+    tile_id = tile_row[:, None] * nx + tile_col[None, :]
+    hists = np.bincount(
+        (tile_id * 256 + img_u8).ravel(), minlength=ny * nx * 256
+    ).reshape(ny * nx, 256)
+    t_grid = otsu_threshold_batch(hists).reshape(ny, nx).astype(np.float32)
+
+    t_map = interpolate_tile_thresholds(t_grid, H, W, tile_size)
+    mask = img_u8 > t_map
     return t_map, mask
+
+def interpolate_tile_thresholds(t_grid: np.ndarray, H: int, W: int, tile_size: int) -> np.ndarray:
+    """
+    Bilineare Interpolation der Kachelschwellen (ny, nx) zwischen den
+    Kachelmittelpunkten auf volle Auflösung (H, W).
+    """
+    i0, i1, fy = _interp_weights(H, tile_size)
+    j0, j1, fx = _interp_weights(W, tile_size)
+    top = t_grid[i0][:, j0] * (1 - fx) + t_grid[i0][:, j1] * fx
+    bottom = t_grid[i1][:, j0] * (1 - fx) + t_grid[i1][:, j1] * fx
+    return top * (1 - fy)[:, None] + bottom * fy[:, None]
+
+def _interp_weights(n: int, tile_size: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Nachbarkacheln und Gewichte für die Interpolation entlang einer Achse.
+    """
+    starts = np.arange(0, n, tile_size)
+    centers = (starts + np.minimum(starts + tile_size, n) - 1) / 2
+    pos = np.interp(np.arange(n), centers, np.arange(len(centers)))
+    idx0 = np.floor(pos).astype(np.intp)
+    idx1 = np.minimum(idx0 + 1, len(centers) - 1)
+    frac = (pos - idx0).astype(np.float32)
+    return idx0, idx1, frac
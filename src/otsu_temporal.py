@@ -0,0 +1,146 @@
+import numpy as np
+from typing import Optional
+from skimage import img_as_ubyte
+from src.gray_hist import image_histogram, bin_to_threshold, _native_bins
+from src.otsu_global import otsu_threshold_batch, binarize, _histogram_otsu
+from src.otsu_local import interpolate_tile_thresholds
+
+
+class TemporalOtsu:
+    """
+    Otsu für Zeitserien mit Wiederverwendung des Vorgängerbildes.
+
+    Aufeinanderfolgende Bilder einer Serie unterscheiden sich meist nur in
+    wenigen Pixeln. Statt das Histogramm jedes Bildes neu zu zählen, werden nur
+    die geänderten Pixel aus dem Histogramm des Vorgängers entfernt bzw.
+    hinzugefügt (exakt, da Ganzzahlzählungen). Die Schwellwertsuche läuft
+    danach über das ganze aktualisierte Histogramm (ein O(L)-Durchlauf, da die
+    Zwischenklassenvarianz mehrere Maxima haben kann) bzw. wird nur für Kacheln
+    mit geänderten Pixeln wiederholt (tiled).
+
+    Drift-Erkennung → vollständige Neuberechnung, wenn
+        - sich mehr als max_change der Pixel geändert haben,
+        - sich Form oder dtype ändern bzw. Werte außerhalb des Histogramms liegen.
+
+    Die Instanz ist aufrufbar (frame → Binärmaske) und kann direkt an
+    segment_stream übergeben werden. Masken entsprechen apply_global_otsu bzw.
+    tiled_otsu auf dem Einzelbild.
+
+    Args:
+        method: "global" oder "tiled"
+        tile_size: Kachelgröße für method="tiled"
+        max_change: Anteil geänderter Pixel, ab dem neu gerechnet wird
+    """
+
+    def __init__(self, method: str = "global", tile_size: int = 128, max_change: float = 0.25):
+        if method not in ("global", "tiled"):
+            raise ValueError(f"Unbekannte Methode: {method}")
+        self.method = method
+        self.tile_size = tile_size
+        self.max_change = max_change
+        self.full_updates = 0
+        self.incremental_updates = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Vergisst den Zustand; das nächste Bild wird vollständig berechnet.
+        """
+        self._prev = None
+        self._hist = None
+        self._bin_edges = None
+        self._t = None
+        self._tile_ids = None
+        self._t_grid = None
+        self._t_map = None
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        if self.method == "tiled":
+            return self._tiled(frame).astype(np.uint8)
+        return self._global(frame)
+
+    # --- Zustandsverwaltung ---------------------------------------------
+
+    def _changed(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Indizes der geänderten Pixel oder None, wenn der Drift-Detektor anschlägt.
+        """
+        prev = self._prev
+        if prev is None or prev.shape != frame.shape or prev.dtype != frame.dtype:
+            return None
+        changed = np.flatnonzero(prev.reshape(-1) != frame.reshape(-1))
+        if changed.size > self.max_change * frame.size:
+            return None
+        return changed
+
+    # --- globales Otsu ---------------------------------------------------
+
+    def _global(self, frame: np.ndarray) -> np.ndarray:
+        frame = np.asarray(frame)
+        changed = self._changed(frame) if frame.dtype.kind == "u" else None
+
+        # Inkrementell nur bei einem Bin pro Grauwert (kein Shift ab 17 Bit)
+        if changed is not None and self._bin_edges[-1] != len(self._hist):
+            changed = None
+        if changed is not None:
+            new_vals = frame.reshape(-1)[changed]
+            if new_vals.size and int(new_vals.max()) >= len(self._hist):
+                changed = None
+
+        if changed is None:
+            self._hist, self._bin_edges = image_histogram(frame)
+            self._t = _histogram_otsu(self._hist)
+            self.full_updates += 1
+        else:
+            L = len(self._hist)
+            self._hist -= np.bincount(self._prev.reshape(-1)[changed], minlength=L)
+            self._hist += np.bincount(new_vals, minlength=L)
+            # Auf die Länge kürzen, die image_histogram für dieses Bild wählen
+            # würde → gleiche Suche, gleiche Schwelle wie apply_global_otsu
+            occupied = np.flatnonzero(self._hist)
+            n, _ = _native_bins(int(occupied[-1]) if occupied.size else 0)
+            self._t = _histogram_otsu(self._hist[:n])
+            self.incremental_updates += 1
+
+        # Vorgänger nur für vorzeichenlose Ganzzahlen merken (inkrementell zählbar)
+        self._prev = np.array(frame) if frame.dtype.kind == "u" else None
+        return binarize(frame, bin_to_threshold(self._t, self._bin_edges, frame.dtype))
+
+    # --- kachelbasiertes Otsu -------------------------------------------
+
+    def _tiled(self, frame: np.ndarray) -> np.ndarray:
+        img_u8 = img_as_ubyte(frame)
+        H, W = img_u8.shape
+        ts = self.tile_size
+        changed = self._changed(img_u8)
+
+        if changed is None:
+            ny, nx = -(-H // ts), -(-W // ts)
+            tile_id = (np.arange(H) // ts)[:, None] * nx + (np.arange(W) // ts)[None, :]
+            self._tile_ids = tile_id.reshape(-1)
+            self._hist = np.bincount(
+                (tile_id * 256 + img_u8).ravel(), minlength=ny * nx * 256
+            ).reshape(ny * nx, 256)
+            self._t_grid = otsu_threshold_batch(self._hist).reshape(ny, nx).astype(np.float32)
+            self._t_map = interpolate_tile_thresholds(self._t_grid, H, W, ts)
+            self.full_updates += 1
+        elif changed.size:
+            ids = self._tile_ids[changed]
+            n = self._hist.size
+            flat = self._hist.reshape(-1)
+            flat -= np.bincount(ids * 256 + self._prev.reshape(-1)[changed], minlength=n)
+            flat += np.bincount(ids * 256 + img_u8.reshape(-1)[changed], minlength=n)
+
+            # Nur Kacheln mit geänderten Pixeln neu bewerten
+            tiles = np.unique(ids)
+            t_new = otsu_threshold_batch(self._hist[tiles]).astype(np.float32)
+            t_grid = self._t_grid.reshape(-1)
+            if not np.array_equal(t_grid[tiles], t_new):
+                t_grid[tiles] = t_new
+                self._t_map = interpolate_tile_thresholds(self._t_grid, H, W, ts)
+            self.incremental_updates += 1
+        else:
+            self.incremental_updates += 1
+
+        self._prev = img_u8 if img_u8 is not frame else np.array(img_u8)
+        return img_u8 > self._t_map
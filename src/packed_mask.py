@@ -0,0 +1,114 @@
+import numpy as np
+from typing import Tuple
+
+# Popcount-Tabelle für NumPy-Versionen ohne np.bitwise_count (< 2.0)
+_POPCOUNT_LUT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(bits: np.ndarray) -> int:
+    """
+    Anzahl gesetzter Bits in einem uint8-Array.
+    """
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(bits).sum(dtype=np.int64))
+    return int(_POPCOUNT_LUT[bits].sum(dtype=np.int64))
+
+
+class PackedMask:
+    """
+    Binärmaske mit einem Bit pro Pixel (np.packbits, 8× kleiner als uint8).
+
+    Summe, Schnittmenge und Dice werden direkt auf den gepackten Bytes per
+    Popcount berechnet. Über __array__ verhält sich die Maske bei Bedarf wie
+    die bisherige uint8-Maske (0/1), z. B. für np.asarray, imshow oder
+    skimage; gepickelt (Prozesspool, Cache) werden nur die gepackten Bits.
+
+    Args:
+        bits: gepackte Bits (uint8, Länge ceil(H·W / 8)); Füllbits sind 0
+        shape: Form der ungepackten Maske
+    """
+
+    __slots__ = ("bits", "shape")
+
+    def __init__(self, bits: np.ndarray, shape: Tuple[int, ...]):
+        self.bits = bits
+        self.shape = tuple(int(n) for n in shape)
+
+    @classmethod
+    def from_array(cls, mask) -> "PackedMask":
+        """
+        Packt eine Maske; alles ≠ 0 gilt als Vordergrund.
+        """
+        if isinstance(mask, cls):
+            return mask
+        mask = np.asarray(mask)
+        return cls(np.packbits(mask.reshape(-1)), mask.shape)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape))
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+    def unpack(self) -> np.ndarray:
+        """
+        Ungepackte Maske (dtype=bool).
+        """
+        return self.to_array().view(bool)
+
+    def to_array(self) -> np.ndarray:
+        """
+        Ungepackte Maske als uint8 (0/1) wie die Rückgabe der Methoden.
+        """
+        return np.unpackbits(self.bits, count=self.size).reshape(self.shape)
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self.to_array()
+        return arr if dtype is None else arr.astype(dtype)
+
+    def sum(self) -> int:
+        return popcount(self.bits)
+
+    def _check(self, other: "PackedMask") -> "PackedMask":
+        other = PackedMask.from_array(other)
+        if other.shape != self.shape:
+            raise ValueError("Die Masken haben unterschiedliche Formen.")
+        return other
+
+    def __and__(self, other) -> "PackedMask":
+        return PackedMask(self.bits & self._check(other).bits, self.shape)
+
+    def __or__(self, other) -> "PackedMask":
+        return PackedMask(self.bits | self._check(other).bits, self.shape)
+
+    def __xor__(self, other) -> "PackedMask":
+        return PackedMask(self.bits ^ self._check(other).bits, self.shape)
+
+    def __invert__(self) -> "PackedMask":
+        bits = ~self.bits
+        pad = bits.size * 8 - self.size
+        if pad:
+            bits[-1] &= np.uint8(0xFF << pad & 0xFF)  # Füllbits bleiben 0
+        return PackedMask(bits, self.shape)
+
+    def intersection(self, other) -> int:
+        """
+        Anzahl der Pixel, die in beiden Masken gesetzt sind.
+        """
+        return popcount(self.bits & self._check(other).bits)
+
+    def dice(self, other) -> float:
+        other = self._check(other)
+        total = self.sum() + other.sum()
+        if total == 0:
+            return 1.0  # Sonderfall: beide leer → perfekte Übereinstimmung
+        return 2 * self.intersection(other) / total
+
+    def __repr__(self) -> str:
+        return f"PackedMask(shape={self.shape}, sum={self.sum()})"
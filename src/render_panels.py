@@ -0,0 +1,143 @@
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from typing import Dict, List, Optional, Tuple
+
+# Farben (RGB) für Konturen im Overlay-Modus
+GT_COLOR = (0, 255, 0)
+PRED_COLOR = (255, 0, 255)
+
+TITLE_HEIGHT = 14
+PADDING = 4
+
+
+def to_display(img: np.ndarray) -> np.ndarray:
+    """
+    Grauwertbild bzw. Maske → uint8 für die Anzeige, skaliert auf [min, max]
+    (wie imshow mit cmap="gray"); Masken werden zu 0 / 255.
+    """
+    img = np.asarray(img)
+    if img.dtype == bool:
+        return img.view(np.uint8) * np.uint8(255)
+    lo, hi = img.min(), img.max()
+    if hi <= lo:
+        return np.zeros(img.shape, dtype=np.uint8)
+    scaled = (img.astype(np.float32) - np.float32(lo)) * np.float32(255.0 / (float(hi) - float(lo)))
+    # runden statt abschneiden, sonst landet das Maximum durch float32-Rundung bei 254
+    return np.clip(np.rint(scaled, out=scaled), 0, 255, out=scaled).astype(np.uint8)
+
+
+def contour(mask: np.ndarray) -> np.ndarray:
+    """
+    Randpixel einer Binärmaske (Maske ohne ihre 4er-Erosion).
+    """
+    mask = np.asarray(mask) != 0
+    inner = mask.copy()
+    inner[1:] &= mask[:-1]
+    inner[:-1] &= mask[1:]
+    inner[:, 1:] &= mask[:, :-1]
+    inner[:, :-1] &= mask[:, 1:]
+    return mask & ~inner
+
+
+def overlay(image: np.ndarray, mask: np.ndarray, gt_mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    RGB-Bild mit den Konturen der Vorhersage (magenta) und optional der GT (grün).
+    """
+    gray = to_display(image)
+    rgb = np.repeat(gray[..., None], 3, axis=2)
+    if gt_mask is not None:
+        rgb[contour(gt_mask)] = GT_COLOR
+    rgb[contour(mask)] = PRED_COLOR
+    return rgb
+
+
+def _panel(img: np.ndarray, title: str, size: Tuple[int, int], font) -> Image.Image:
+    arr = img if img.dtype == np.uint8 and img.ndim == 3 else to_display(img)
+    panel = Image.fromarray(arr)
+    if panel.size != size:
+        # Masken ohne Zwischenwerte verkleinern, Bilder geglättet
+        resample = Image.NEAREST if arr.ndim == 2 and np.asarray(img).dtype == bool else Image.BILINEAR
+        panel = panel.resize(size, resample)
+    tile = Image.new("RGB", (size[0], size[1] + TITLE_HEIGHT), "white")
+    tile.paste(panel.convert("RGB"), (0, TITLE_HEIGHT))
+    ImageDraw.Draw(tile).text((2, 1), title, fill="black", font=font)
+    return tile
+
+
+def compose_panels(
+    items: List[Tuple[str, np.ndarray]], max_cols: int = 3, thumbnail: Optional[int] = None
+) -> np.ndarray:
+    """
+    Setzt Bilder/Masken mit Titel zu einem Raster zusammen (ohne matplotlib).
+
+    Args:
+        items: Liste (Titel, Bild); 2-D-Bilder werden grau dargestellt, RGB-uint8
+               (z. B. aus overlay) unverändert
+        max_cols: maximale Anzahl an Spalten pro Zeile
+        thumbnail: optionale maximale Kantenlänge eines Panels in Pixeln
+
+    Returns:
+        RGB-Bild (uint8)
+    """
+    H, W = np.asarray(items[0][1]).shape[:2]
+    if thumbnail and max(H, W) > thumbnail:
+        scale = thumbnail / max(H, W)
+        H, W = max(1, round(H * scale)), max(1, round(W * scale))
+
+    n = len(items)
+    cols = min(n, max_cols)
+    rows = (n + cols - 1) // cols
+    cell_w, cell_h = W + PADDING, H + TITLE_HEIGHT + PADDING
+
+    font = ImageFont.load_default()
+    canvas = Image.new("RGB", (cols * cell_w + PADDING, rows * cell_h + PADDING), "white")
+    for k, (title, img) in enumerate(items):
+        r, c = divmod(k, cols)
+        canvas.paste(_panel(img, title, (W, H), font), (PADDING + c * cell_w, PADDING + r * cell_h))
+    return np.asarray(canvas)
+
+
+def save_png(rgb: np.ndarray, path: str) -> None:
+    """
+    Schreibt ein RGB-Array als PNG mit schneller Kompressionsstufe.
+    """
+    Image.fromarray(rgb).save(path, compress_level=1)
+
+
+def render_segmentations(
+    image: np.ndarray,
+    gt_mask: np.ndarray,
+    predictions: Dict[str, np.ndarray],
+    save_path: str,
+    max_cols: int = 3,
+    thumbnail: Optional[int] = None,
+    mode: str = "panels"
+) -> np.ndarray:
+    """
+    Schnelle, fensterlose Alternative zu visualize_segmentations für Batch-Läufe
+    (auch in Worker-Prozessen): alle Panels werden als NumPy-Arrays
+    zusammengesetzt und direkt als PNG geschrieben.
+
+    Args:
+        image: Originalbild (Graustufen)
+        gt_mask: Ground Truth Maske (bool)
+        predictions: Dict {Methodenname: Binärmaske (0/1, bool oder PackedMask)}
+        save_path: Zielpfad (PNG)
+        max_cols: maximale Anzahl an Spalten pro Zeile
+        thumbnail: optionale maximale Kantenlänge eines Panels in Pixeln
+        mode: "panels" (Original, GT, Masken) oder "overlay" (Original, dann je
+              Methode das Original mit Konturen von GT und Vorhersage)
+
+    Returns:
+        das geschriebene RGB-Bild
+    """
+    items = [("Original", image)]
+    if mode == "overlay":
+        items += [(name, overlay(image, mask, gt_mask)) for name, mask in predictions.items()]
+    else:
+        items += [("Ground Truth", np.asarray(gt_mask) != 0)]
+        items += [(name, np.asarray(mask) != 0) for name, mask in predictions.items()]
+
+    rgb = compose_panels(items, max_cols=max_cols, thumbnail=thumbnail)
+    save_png(rgb, save_path)
+    return rgb
@@ -0,0 +1,160 @@
+import csv
+import glob
+import io
+import os
+from typing import Iterable, List, Set, Tuple
+
+
+class ResultsWriter:
+    """
+    Streamender Ergebnis-Schreiber: Zeilen werden nach jedem Bild angehängt statt
+    erst am Ende als DataFrame zusammengeführt.
+
+    - Endet der Pfad auf ".csv", wird an eine CSV-Datei angehängt; die Zeilen
+      eines Bildes werden in einem Schreibvorgang geschrieben und geflusht.
+    - Endet er auf ".parquet", entsteht ein Verzeichnis mit Parquet-Teildateien
+      (je eine Row Group, alle `images_per_part` Bilder), lesbar mit
+      pd.read_parquet(pfad). Benötigt pyarrow. Nach einem Absturz fehlen
+      höchstens die noch nicht geschriebenen `images_per_part` Bilder.
+
+    Mit resume=True bleiben vorhandene Ergebnisse erhalten (nur eine durch einen
+    Absturz abgeschnittene letzte CSV-Zeile wird entfernt); completed() liefert
+    die bereits fertigen (Datensatz, Bild)-Paare, damit ein abgebrochener Lauf
+    nach dem letzten vollständigen Bild fortgesetzt werden kann.
+    """
+
+    def __init__(self, path: str, columns: List[str], resume: bool = False, images_per_part: int = 1):
+        self.path = path
+        self.columns = columns
+        self.images_per_part = images_per_part
+        self._parquet = path.endswith(".parquet")
+        self._completed: Set[Tuple[str, str]] = set()
+        self._pending: List[dict] = []
+        self._pending_images = 0
+
+        if self._parquet:
+            self._open_parquet(resume)
+        else:
+            self._open_csv(resume)
+
+    def completed(self) -> Set[Tuple[str, str]]:
+        return self._completed
+
+    def write(self, records: Iterable[dict]) -> None:
+        """
+        Schreibt die Zeilen eines vollständig ausgewerteten Bildes.
+        """
+        records = list(records)
+        if not records:
+            return
+
+        for record in records:
+            self._completed.add(self._key(record))
+
+        if self._parquet:
+            self._pending.extend(records)
+            self._pending_images += 1
+            if self._pending_images >= self.images_per_part:
+                self._flush_parquet()
+        else:
+            # Alle Zeilen des Bildes in einem write() → ein Abbruch hinterlässt
+            # höchstens eine abgeschnittene letzte Zeile
+            buffer = io.StringIO()
+            csv.DictWriter(buffer, fieldnames=self.columns, extrasaction="ignore",
+                           lineterminator="\n").writerows(records)
+            self._file.write(buffer.getvalue())
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._parquet:
+            self._flush_parquet()
+        else:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _key(record: dict) -> Tuple[str, str]:
+        return str(record.get("Datensatz", "") or ""), str(record["Bild"])
+
+    def _open_csv(self, resume: bool) -> None:
+        exists = resume and os.path.exists(self.path) and os.path.getsize(self.path) > 0
+        if exists:
+            self._drop_truncated_line()
+            exists = os.path.getsize(self.path) > 0
+        if exists:
+            with open(self.path, newline="", encoding="utf-8") as f:
+                reader = csv.DictReader(f)
+                if reader.fieldnames != self.columns:
+                    raise ValueError(
+                        f"Spalten in {self.path} ({reader.fieldnames}) passen nicht zu {self.columns}."
+                    )
+                for record in reader:
+                    self._completed.add(self._key(record))
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "a" if exists else "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns,
+                                      extrasaction="ignore", lineterminator="\n")
+        if not exists:
+            self._writer.writeheader()
+            self._file.flush()
+
+    def _drop_truncated_line(self) -> None:
+        """
+        Entfernt eine abgeschnittene letzte Zeile (Datei endet nicht auf "\\n"),
+        wie sie ein Absturz während des Schreibens hinterlassen kann.
+        Vollständige Zeilen bleiben unverändert.
+        """
+        with open(self.path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            data = f.read()
+            f.seek(data.rfind(b"\n") + 1)
+            f.truncate()
+
+    def _open_parquet(self, resume: bool) -> None:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("Für Parquet-Ausgabe wird pyarrow benötigt (pip install pyarrow).") from e
+
+        import pyarrow.parquet as pq
+
+        os.makedirs(self.path, exist_ok=True)
+        parts = sorted(glob.glob(os.path.join(self.path, "part-*.parquet")))
+        if not resume:
+            for part in parts:
+                os.remove(part)
+            parts = []
+
+        for part in parts:
+            table = pq.read_table(part, columns=[c for c in ("Datensatz", "Bild") if c in self.columns])
+            for record in table.to_pylist():
+                self._completed.add(self._key(record))
+        self._next_part = len(parts)
+
+    def _flush_parquet(self) -> None:
+        if not self._pending:
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pylist(
+            [{c: r.get(c) for c in self.columns} for r in self._pending]
+        )
+        part = os.path.join(self.path, f"part-{self._next_part:05d}.parquet")
+        tmp_part = f"{part}.tmp"
+        pq.write_table(table, tmp_part)
+        os.replace(tmp_part, part)  # nur vollständige Teildateien sind sichtbar
+
+        self._next_part += 1
+        self._pending = []
+        self._pending_images = 0
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from src.mask_cache import code_version
+
+
+class RunManifest:
+    """
+    Protokoll abgeschlossener Auswertungseinheiten (Datensatz, Bild, Methode).
+
+    Jede Einheit wird mit einem Fingerabdruck aus Bild- und GT-Datei (Größe,
+    Änderungszeit), Methodenparametern und Code-Version der Methode als
+    JSON-Zeile angehängt, zusammen mit ihren Ergebnissen. Nach einem Abbruch
+    oder nach kleinen Änderungen liefert pending() nur die Methoden, deren
+    Einheit fehlt oder deren Fingerabdruck sich geändert hat.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._units: Dict[Tuple[str, str, str], dict] = {}
+        self._versions: Dict[object, str] = {}
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # abgeschnittene letzte Zeile nach Absturz
+                    self._units[self._key(entry["Datensatz"], entry["Bild"], entry["Methode"])] = entry
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def fingerprint(self, img_path: str, gt_path: str, func, params: dict, extra=None) -> str:
+        """
+        Fingerabdruck einer Einheit; ändert sich, sobald Bild, GT, Parameter oder
+        der Code der Methode sich ändern.
+        """
+        if func not in self._versions:
+            self._versions[func] = code_version(func)
+
+        files = []
+        for path in (img_path, gt_path):
+            st = os.stat(path)
+            files.append([st.st_size, st.st_mtime_ns])
+
+        payload = json.dumps([files, params, self._versions[func], extra], sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def pending(self, dataset: Optional[str], image: str, fingerprints: Dict[str, str]) -> List[str]:
+        """
+        Methoden (aus fingerprints: Methode → Fingerabdruck), die für dieses Bild
+        noch berechnet werden müssen.
+        """
+        return [
+            method for method, fp in fingerprints.items()
+            if self._units.get(self._key(dataset, image, method), {}).get("fingerprint") != fp
+        ]
+
+    def results(self, dataset: Optional[str], image: str, methods: List[str]) -> List[dict]:
+        """
+        Gespeicherte Ergebnis-Records der angegebenen Methoden.
+        """
+        records = []
+        for method in methods:
+            entry = self._units.get(self._key(dataset, image, method))
+            if entry is not None:
+                records.append(dict(entry["record"]))
+        return records
+
+    def record(self, dataset: Optional[str], image: str, method: str, fingerprint: str, record: dict) -> None:
+        entry = {
+            "Datensatz": dataset or "",
+            "Bild": image,
+            "Methode": method,
+            "fingerprint": fingerprint,
+            "record": record,
+        }
+        self._units[self._key(dataset, image, method)] = entry
+        self._file.write(json.dumps(entry, default=float) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _key(dataset: Optional[str], image: str, method: str) -> Tuple[str, str, str]:
+        return dataset or "", image, method
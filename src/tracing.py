@@ -0,0 +1,171 @@
+import contextvars
+import csv
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterable, List, Optional
+
+# Über die Umgebung aktiviert, damit auch Worker-Prozesse (fork / spawn) mitschreiben
+ENV_VAR = "OTSU_TRACE"
+
+_enabled = os.environ.get(ENV_VAR, "") not in ("", "0")
+_events: List[dict] = []
+_lock = threading.Lock()
+_NULL = nullcontext()
+
+# Zusatzangaben (z. B. Datensatz, Bild), die an alle Spans im Kontext angehängt werden
+_context: contextvars.ContextVar = contextvars.ContextVar("trace_context", default={})
+
+
+# Per fork gestartete Worker erben den Puffer des Hauptprozesses → dort leeren
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_events.clear)
+
+
+def enable(flag: bool = True) -> None:
+    """
+    Schaltet das Tracing ein bzw. aus (auch für danach gestartete Worker-Prozesse).
+    """
+    global _enabled
+    _enabled = flag
+    os.environ[ENV_VAR] = "1" if flag else "0"
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def span(name: str, **args):
+    """
+    Misst die Dauer eines Abschnitts als Chrome-Trace-Event ("X").
+
+    Ist das Tracing aus, wird ein gemeinsamer No-op-Kontextmanager
+    zurückgegeben; es entstehen weder Zeitmessung noch Allokationen.
+
+        with span("dice", method=name):
+            ...
+    """
+    if not _enabled:
+        return _NULL
+    return _span(name, args)
+
+
+@contextmanager
+def _span(name: str, args: dict):
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        end = time.perf_counter_ns()
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": start / 1000,
+            "dur": (end - start) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {**_context.get(), **args},
+        }
+        with _lock:
+            _events.append(event)
+
+
+def context(**args):
+    """
+    Hängt args an alle Spans innerhalb des with-Blocks an (z. B. dataset, image).
+    """
+    if not _enabled:
+        return _NULL
+    return _scoped_context(args)
+
+
+@contextmanager
+def _scoped_context(args: dict):
+    token = _context.set({**_context.get(), **args})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def collect() -> List[dict]:
+    """
+    Gibt die bisher aufgezeichneten Events zurück und leert den Puffer
+    (Worker-Prozesse schicken sie so mit ihren Ergebnissen an den Hauptprozess).
+    """
+    with _lock:
+        events = _events[:]
+        _events.clear()
+    return events
+
+
+def add_events(events: Iterable[dict]) -> None:
+    """
+    Übernimmt Events aus einem Worker-Prozess.
+    """
+    events = list(events)
+    if events:
+        with _lock:
+            _events.extend(events)
+
+
+def events() -> List[dict]:
+    with _lock:
+        return _events[:]
+
+
+def summarize(trace_events: Optional[List[dict]] = None) -> List[Dict]:
+    """
+    Aggregiert die Spans je (Stufe, Methode, Datensatz).
+
+    Returns:
+        Records mit Stufe, Methode, Datensatz, Anzahl, Summe [s], Mittel [ms],
+        Max [ms]; absteigend nach Gesamtzeit
+    """
+    groups = {}
+    for event in (events() if trace_events is None else trace_events):
+        args = event.get("args", {})
+        key = (event["name"], args.get("method", ""), args.get("dataset", ""))
+        groups.setdefault(key, []).append(event["dur"] / 1e6)
+
+    rows = [
+        {
+            "Stufe": stage,
+            "Methode": method,
+            "Datensatz": dataset,
+            "Anzahl": len(durations),
+            "Summe [s]": round(sum(durations), 6),
+            "Mittel [ms]": round(1e3 * sum(durations) / len(durations), 3),
+            "Max [ms]": round(1e3 * max(durations), 3),
+        }
+        for (stage, method, dataset), durations in groups.items()
+    ]
+    rows.sort(key=lambda r: r["Summe [s]"], reverse=True)
+    return rows
+
+
+def export(results_dir: str, prefix: str = "trace") -> None:
+    """
+    Schreibt alle Events als Chrome-Trace / Perfetto-JSON (<prefix>.json, zu
+    öffnen in chrome://tracing oder ui.perfetto.dev) und die Zusammenfassung
+    als CSV (<prefix>_summary.csv) nach results_dir.
+    """
+    trace_events = events()
+    os.makedirs(results_dir, exist_ok=True)
+
+    trace_path = os.path.join(results_dir, f"{prefix}.json")
+    with open(trace_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+
+    rows = summarize(trace_events)
+    summary_path = os.path.join(results_dir, f"{prefix}_summary.csv")
+    with open(summary_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["Stufe", "Methode", "Datensatz", "Anzahl",
+                                               "Summe [s]", "Mittel [ms]", "Max [ms]"],
+                                lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print(f"⏱️  Trace gespeichert: {trace_path} ({len(trace_events)} Spans), Übersicht: {summary_path}")
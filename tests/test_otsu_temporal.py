@@ -0,0 +1,33 @@
+import numpy as np
+
+from src.otsu_global import apply_global_otsu
+from src.otsu_temporal import TemporalOtsu
+
+
+def _trimodal_frames(n_frames=30, dtype=np.uint8, scale=1):
+    """
+    100×100-Bild mit Moden bei 30 / 128 / 225; pro Bild wandern 40 Pixel
+    von der unteren in die obere Mode. sigma_b² hat zwei Maxima, die Schwelle
+    springt nach dem ersten Bild von 30 auf 128.
+    """
+    frame = np.full(10_000, 30, dtype=np.int64)
+    frame[2_000:8_000] = 128
+    frame[8_000:] = 225
+    for _ in range(n_frames):
+        yield (frame * scale).astype(dtype).reshape(100, 100)
+        low = np.flatnonzero(frame == 30)[:40]
+        frame[low] = 225
+
+
+def test_global_matches_per_frame_otsu_on_multimodal_sequence():
+    temporal = TemporalOtsu("global")
+    for frame in _trimodal_frames():
+        np.testing.assert_array_equal(temporal(frame), apply_global_otsu(frame))
+    assert temporal.incremental_updates > 0
+
+
+def test_global_matches_per_frame_otsu_uint16():
+    temporal = TemporalOtsu("global")
+    for frame in _trimodal_frames(dtype=np.uint16, scale=200):
+        np.testing.assert_array_equal(temporal(frame), apply_global_otsu(frame))
+    assert temporal.incremental_updates > 0